@@ -93,6 +93,40 @@ def validate_input_image(image_path):
     return path
 
 
+def parse_quality_levels(quality_levels_arg):
+    """
+    Parse and canonicalize the --quality-levels argument.
+    
+    Values are deduplicated, restricted to the valid JPEG range (1-100)
+    and sorted, so no two workers compress to the same output file.
+    
+    Args:
+        quality_levels_arg: Comma-separated quality levels string
+    
+    Returns:
+        list: Sorted unique quality levels
+    
+    Raises:
+        ValueError: If a value is not an integer or no valid level remains
+    """
+    requested = [int(q.strip()) for q in quality_levels_arg.split(",") if q.strip()]
+    
+    out_of_range = [q for q in requested if not 1 <= q <= 100]
+    if out_of_range:
+        logger.warning(f"Ignoring quality levels outside 1-100: {out_of_range}")
+    
+    quality_levels = sorted({q for q in requested if 1 <= q <= 100})
+    
+    num_duplicates = len(requested) - len(out_of_range) - len(quality_levels)
+    if num_duplicates:
+        logger.warning(f"Dropped {num_duplicates} duplicate quality level(s)")
+    
+    if not quality_levels:
+        raise ValueError(f"No valid quality levels in: {quality_levels_arg}")
+    
+    return quality_levels
+
+
 def main():
     """Main execution function."""
     try:
@@ -113,7 +147,7 @@ def main():
         
         # Parse quality levels
         if args.quality_levels:
-            quality_levels = [int(q.strip()) for q in args.quality_levels.split(",")]
+            quality_levels = parse_quality_levels(args.quality_levels)
         else:
             quality_levels = QUALITY_LEVELS
         
@@ -157,7 +191,6 @@ def main():
         logger.info("\n" + "=" * 60)
         logger.info("Task 4: Creating file size histogram...")
         logger.info("=" * 60)
-        from .tasks.visualize_task import create_file_size_histogram
         create_file_size_histogram(original_array.nbytes, compressed_results)
         
         # Task 5: Create error histogram
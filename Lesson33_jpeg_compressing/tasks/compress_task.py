@@ -3,9 +3,14 @@ Image compression task using JPEG at multiple quality levels.
 Author: Yair Levi
 """
 
+import io
+from dataclasses import dataclass
 from pathlib import Path
+from typing import List
+import numpy as np
 from PIL import Image
-from multiprocessing import Pool, cpu_count
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
 
 from ..utils.logger import get_logger
 from ..utils.config import (
@@ -17,6 +22,26 @@ from ..utils.config import (
 logger = get_logger(__name__)
 
 
+@dataclass
+class CompressResults:
+    """
+    Compression results stored as parallel arrays, sorted by quality.
+    
+    Attributes:
+        qualities: JPEG quality levels
+        paths: Paths to the compressed files
+        sizes: Compressed file sizes in bytes
+        data: Encoded JPEG bytes, kept in memory for decompression
+    """
+    qualities: np.ndarray
+    paths: List[str]
+    sizes: np.ndarray
+    data: List[bytes]
+    
+    def __len__(self):
+        return len(self.paths)
+
+
 def compress_single(args):
     """
     Compress a single image at specified quality.
@@ -25,7 +50,7 @@ def compress_single(args):
         args: Tuple of (image_path, quality, output_dir)
     
     Returns:
-        Tuple of (quality, output_path, file_size)
+        Tuple of (quality, output_path, file_size, jpeg_bytes)
     """
     image_path, quality, output_dir = args
     
@@ -37,27 +62,33 @@ def compress_single(args):
         output_filename = get_compressed_filename(quality)
         output_path = output_dir / output_filename
         
-        # Save as JPEG with specified quality
-        img.save(output_path, format=JPEG_FORMAT, quality=quality)
+        # Encode JPEG in memory; its length is the file size (no stat needed)
+        buffer = io.BytesIO()
+        img.save(buffer, format=JPEG_FORMAT, quality=quality)
+        jpeg_bytes = buffer.getvalue()
+        file_size = len(jpeg_bytes)
         
-        # Get file size
-        file_size = output_path.stat().st_size
+        # Write encoded bytes to disk in a single call
+        output_path.write_bytes(jpeg_bytes)
         
         logger.info(
             f"Compressed at Q={quality}: {output_path.name} "
             f"({file_size / 1024:.2f} KB)"
         )
         
-        return quality, str(output_path), file_size
+        return quality, str(output_path), file_size, jpeg_bytes
     
     except Exception as e:
         logger.error(f"Error compressing at Q={quality}: {e}")
-        return quality, None, 0
+        return quality, None, 0, None
 
 
 def compress_image(image_path, quality_levels, output_dir=None):
     """
-    Compress image at multiple quality levels using multiprocessing.
+    Compress image at multiple quality levels in parallel.
+    
+    Pillow releases the GIL while encoding, so a thread pool runs the
+    encoders concurrently and hands the JPEG bytes back without pickling.
     
     Args:
         image_path: Path to input image
@@ -65,7 +96,7 @@ def compress_image(image_path, quality_levels, output_dir=None):
         output_dir: Output directory (defaults to COMPRESSED_DIR)
     
     Returns:
-        List of tuples: [(quality, path, size), ...]
+        CompressResults: Successful results sorted by quality
     """
     if output_dir is None:
         output_dir = COMPRESSED_DIR
@@ -83,25 +114,33 @@ def compress_image(image_path, quality_levels, output_dir=None):
     logger.info(f"Starting compression of {image_path.name} "
                 f"at {len(quality_levels)} quality levels")
     
-    # Prepare arguments for multiprocessing
+    # Prepare arguments for the worker threads
     compress_args = [
         (image_path, quality, output_dir)
         for quality in quality_levels
     ]
     
-    # Use multiprocessing pool
-    num_processes = min(len(quality_levels), cpu_count())
-    logger.info(f"Using {num_processes} parallel processes")
+    # Use thread pool
+    num_threads = min(len(quality_levels), cpu_count())
+    logger.info(f"Using {num_threads} parallel threads")
     
-    with Pool(processes=num_processes) as pool:
+    with ThreadPool(processes=num_threads) as pool:
         results = pool.map(compress_single, compress_args)
     
-    # Filter successful results
-    successful_results = [r for r in results if r[1] is not None]
+    # Filter successful results and sort them by quality once
+    successful_results = sorted(
+        (r for r in results if r[1] is not None),
+        key=lambda r: r[0]
+    )
     
     logger.info(
         f"Compression complete: {len(successful_results)}/{len(quality_levels)} "
         f"succeeded"
     )
     
-    return successful_results
+    return CompressResults(
+        qualities=np.array([r[0] for r in successful_results], dtype=np.int64),
+        paths=[r[1] for r in successful_results],
+        sizes=np.array([r[2] for r in successful_results], dtype=np.int64),
+        data=[r[3] for r in successful_results],
+    )
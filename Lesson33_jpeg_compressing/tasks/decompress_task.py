@@ -3,42 +3,105 @@ Image decompression task.
 Author: Yair Levi
 """
 
+import io
+from dataclasses import dataclass
 from pathlib import Path
+from typing import List, Optional
 import numpy as np
 from PIL import Image
-from multiprocessing import Pool, cpu_count
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
 
 from ..utils.logger import get_logger
-from ..utils.config import DECOMPRESSED_DIR, get_decompressed_filename, PNG_FORMAT
+from ..utils.config import (
+    DECOMPRESSED_DIR,
+    get_decompressed_filename,
+    PNG_FORMAT,
+    PNG_COMPRESS_LEVEL,
+    DECOMPRESSED_SAVE_FORMAT,
+    GPU_DECODE_MIN_IMAGES,
+)
+from ..utils.gpu_decoder import gpu_decode_available, decode_jpegs_gpu
 
 logger = get_logger(__name__)
 
 
+@dataclass
+class DecompressResults:
+    """
+    Decompression results stored as parallel arrays, in compression order.
+    
+    Attributes:
+        qualities: JPEG quality levels
+        arrays: Decompressed images as numpy arrays
+        paths: Paths to saved decompressed images (None if not saved)
+    """
+    qualities: np.ndarray
+    arrays: List[np.ndarray]
+    paths: List[Optional[str]]
+    
+    def __len__(self):
+        return len(self.arrays)
+
+
+def save_decompressed(img_array, quality, output_dir, img=None):
+    """
+    Save a decompressed image in the configured format.
+    
+    PNG is written with a low zlib level (DEFLATE dominates otherwise);
+    "npy" dumps the raw array, which is lossless and near memcpy speed.
+    
+    Args:
+        img_array: Decompressed image as numpy array
+        quality: JPEG quality level
+        output_dir: Output directory
+        img: Already-decoded PIL image for the same pixels (optional)
+    
+    Returns:
+        Path: Path of the saved file
+    """
+    output_path = output_dir / get_decompressed_filename(quality)
+    
+    if DECOMPRESSED_SAVE_FORMAT == "npy":
+        output_path = output_path.with_suffix(".npy")
+        np.save(output_path, img_array)
+    else:
+        if img is None:
+            img = Image.fromarray(img_array)
+        img.save(
+            output_path,
+            format=PNG_FORMAT,
+            compress_level=PNG_COMPRESS_LEVEL
+        )
+    
+    return output_path
+
+
 def decompress_single(args):
     """
     Decompress a single JPEG image.
     
     Args:
-        args: Tuple of (compressed_path, quality, output_dir, save_to_disk)
+        args: Tuple of (jpeg_bytes, quality, output_dir, save_to_disk)
     
     Returns:
         Tuple of (quality, numpy_array, output_path)
     """
-    compressed_path, quality, output_dir, save_to_disk = args
+    jpeg_bytes, quality, output_dir, save_to_disk = args
     
     try:
-        # Load compressed image
-        img = Image.open(compressed_path)
+        # Load compressed image, decoding straight to RGB in a single pass
+        img = Image.open(io.BytesIO(jpeg_bytes))
+        img.draft('RGB', img.size)
+        img.load()
         
-        # Convert to numpy array
-        img_array = np.array(img)
+        # View the decoded pixels as a numpy array (read-only, no extra copy)
+        img_array = np.asarray(img)
         
-        # Optionally save decompressed image
+        # Optionally save the already-decoded image
         output_path = None
         if save_to_disk:
-            output_filename = get_decompressed_filename(quality)
-            output_path = output_dir / output_filename
-            img.save(output_path, format=PNG_FORMAT)
+            output_path = save_decompressed(img_array, quality, output_dir, img)
             logger.info(f"Decompressed Q={quality}: {output_path.name}")
         else:
             logger.info(f"Decompressed Q={quality} (in-memory only)")
@@ -50,17 +113,45 @@ def decompress_single(args):
         return quality, None, None
 
 
+def decompress_images_gpu(compressed_results, output_dir, save_to_disk):
+    """
+    Decompress multiple JPEG images in one batched GPU (nvJPEG) call.
+    
+    Args:
+        compressed_results: CompressResults from compress_task
+        output_dir: Output directory for decompressed images
+        save_to_disk: Whether to save decompressed images to disk
+    
+    Returns:
+        DecompressResults: Decompressed images for every quality level
+    """
+    arrays = decode_jpegs_gpu(compressed_results.data)
+    
+    paths = []
+    for quality, img_array in zip(compressed_results.qualities, arrays):
+        output_path = None
+        if save_to_disk:
+            output_path = save_decompressed(img_array, quality, output_dir)
+        paths.append(str(output_path) if output_path else None)
+    
+    return DecompressResults(
+        qualities=compressed_results.qualities.copy(),
+        arrays=arrays,
+        paths=paths,
+    )
+
+
 def decompress_images(compressed_results, output_dir=None, save_to_disk=False):
     """
-    Decompress multiple JPEG images using multiprocessing.
+    Decompress multiple JPEG images in parallel.
     
     Args:
-        compressed_results: List of tuples from compress_task
+        compressed_results: CompressResults from compress_task
         output_dir: Output directory (defaults to DECOMPRESSED_DIR)
         save_to_disk: Whether to save decompressed images to disk
     
     Returns:
-        List of tuples: [(quality, numpy_array, path), ...]
+        DecompressResults: Successfully decompressed images
     """
     if output_dir is None:
         output_dir = DECOMPRESSED_DIR
@@ -71,17 +162,26 @@ def decompress_images(compressed_results, output_dir=None, save_to_disk=False):
     
     logger.info(f"Starting decompression of {len(compressed_results)} images")
     
-    # Prepare arguments for multiprocessing
+    # Batched GPU decode pays off only with enough images to amortize setup
+    if len(compressed_results) >= GPU_DECODE_MIN_IMAGES and gpu_decode_available():
+        try:
+            results = decompress_images_gpu(compressed_results, output_dir, save_to_disk)
+            logger.info(f"Decompression complete on GPU: {len(results)} images")
+            return results
+        except Exception as e:
+            logger.warning(f"GPU decoding failed, falling back to CPU: {e}")
+    
+    # Decode the in-memory JPEG bytes instead of re-reading them from disk
     decompress_args = [
-        (result[1], result[0], output_dir, save_to_disk)
-        for result in compressed_results
+        (jpeg_bytes, quality, output_dir, save_to_disk)
+        for quality, jpeg_bytes in zip(compressed_results.qualities, compressed_results.data)
     ]
     
-    # Use multiprocessing pool
-    num_processes = min(len(compressed_results), cpu_count())
-    logger.info(f"Using {num_processes} parallel processes")
+    # Use thread pool (Pillow releases the GIL while decoding)
+    num_threads = min(len(compressed_results), cpu_count())
+    logger.info(f"Using {num_threads} parallel threads")
     
-    with Pool(processes=num_processes) as pool:
+    with ThreadPool(processes=num_threads) as pool:
         results = pool.map(decompress_single, decompress_args)
     
     # Filter successful results
@@ -92,4 +192,8 @@ def decompress_images(compressed_results, output_dir=None, save_to_disk=False):
         f"{len(compressed_results)} succeeded"
     )
     
-    return successful_results
+    return DecompressResults(
+        qualities=np.array([r[0] for r in successful_results], dtype=np.int64),
+        arrays=[r[1] for r in successful_results],
+        paths=[r[2] for r in successful_results],
+    )
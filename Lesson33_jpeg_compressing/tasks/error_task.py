@@ -4,11 +4,18 @@ Author: Yair Levi
 """
 
 from pathlib import Path
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
 import numpy as np
-import pandas as pd
 
 from ..utils.logger import get_logger
-from ..utils.config import METRICS_DIR, get_metrics_filename, METRIC_COLUMNS
+from ..utils.config import (
+    METRICS_DIR,
+    get_metrics_filename,
+    METRIC_COLUMNS,
+    METRIC_DTYPES,
+    ERROR_TILE_BYTES,
+)
 
 logger = get_logger(__name__)
 
@@ -31,12 +38,11 @@ def calculate_mse(original, decompressed):
         )
         return float('inf')
     
-    # Convert to float to avoid overflow
-    original_float = original.astype(np.float64)
-    decompressed_float = decompressed.astype(np.float64)
-    
-    # Calculate MSE
-    mse = np.mean((original_float - decompressed_float) ** 2)
+    # Integer arithmetic cannot overflow for 8-bit inputs: the difference
+    # fits in int16, its square (<= 65025) in int32, and the sum in uint64
+    diff = original.astype(np.int16) - decompressed.astype(np.int16)
+    squared = np.multiply(diff, diff, dtype=np.int32)
+    mse = squared.sum(dtype=np.uint64) / diff.size
     
     return float(mse)
 
@@ -55,24 +61,109 @@ def calculate_mae(original, decompressed):
     if original.shape != decompressed.shape:
         return float('inf')
     
-    # Convert to float
-    original_float = original.astype(np.float64)
-    decompressed_float = decompressed.astype(np.float64)
-    
-    # Calculate MAE
-    mae = np.mean(np.abs(original_float - decompressed_float))
+    # Integer arithmetic (see calculate_mse for the overflow bounds)
+    diff = original.astype(np.int16) - decompressed.astype(np.int16)
+    mae = np.abs(diff).sum(dtype=np.uint64) / diff.size
     
     return float(mae)
 
 
+def sum_errors_range(stack, original_flat, start, stop, tile):
+    """
+    Sum squared and absolute differences over one pixel range, tile by tile.
+    
+    Args:
+        stack: Decompressed images as a (Q, pixels) array
+        original_flat: Flattened original image
+        start: First pixel index of the range
+        stop: End pixel index of the range (exclusive)
+        tile: Pixels per tile
+    
+    Returns:
+        Tuple of (sum_sq, sum_abs) uint64 arrays, one entry per image
+    """
+    sum_sq = np.zeros(stack.shape[0], dtype=np.uint64)
+    sum_abs = np.zeros(stack.shape[0], dtype=np.uint64)
+    for tile_start in range(start, stop, tile):
+        tile_stop = min(tile_start + tile, stop)
+        diff = stack[:, tile_start:tile_stop].astype(np.int32)
+        diff -= original_flat[tile_start:tile_stop]
+        sum_abs += np.abs(diff).sum(axis=1, dtype=np.uint64)
+        sum_sq += np.square(diff).sum(axis=1, dtype=np.uint64)
+    return sum_sq, sum_abs
+
+
+def calculate_errors_batch(original, decompressed_arrays):
+    """
+    Calculate MSE and MAE for several decompressed images at once.
+    
+    The images are stacked into a single (Q, pixels) array and reduced in
+    cache-sized tiles, so the int32 difference buffer stays in L2 instead
+    of materializing a full-image temporary per quality level. The pixel
+    range is split across a ThreadPool (NumPy releases the GIL in these
+    kernels), each thread walking its own tiles.
+    
+    Args:
+        original: Original image as numpy array
+        decompressed_arrays: List of decompressed images as numpy arrays
+    
+    Returns:
+        Tuple of (mse_values, mae_values) numpy arrays, one entry per image
+    """
+    num_images = len(decompressed_arrays)
+    mse_values = np.full(num_images, np.inf)
+    mae_values = np.full(num_images, np.inf)
+    
+    # Only images matching the original shape can be compared
+    valid = []
+    for i, arr in enumerate(decompressed_arrays):
+        if arr.shape == original.shape:
+            valid.append(i)
+        else:
+            logger.warning(
+                f"Shape mismatch: original {original.shape} vs "
+                f"decompressed {arr.shape}"
+            )
+    
+    if not valid:
+        return mse_values, mae_values
+    
+    stack = np.stack([decompressed_arrays[i].ravel() for i in valid])
+    original_flat = original.ravel()
+    num_pixels = original_flat.size
+    
+    # Tile width so that the (Q, tile) int32 difference fits in ERROR_TILE_BYTES
+    tile = max(1, ERROR_TILE_BYTES // (len(valid) * 4))
+    
+    # One contiguous, tile-aligned pixel range per thread
+    num_tiles = -(-num_pixels // tile)
+    num_threads = max(1, min(num_tiles, cpu_count()))
+    range_size = -(-num_tiles // num_threads) * tile
+    ranges = [
+        (stack, original_flat, start, min(start + range_size, num_pixels), tile)
+        for start in range(0, num_pixels, range_size)
+    ]
+    
+    with ThreadPool(processes=len(ranges)) as pool:
+        partial_sums = pool.starmap(sum_errors_range, ranges)
+    
+    sum_sq = np.sum([sums[0] for sums in partial_sums], axis=0, dtype=np.uint64)
+    sum_abs = np.sum([sums[1] for sums in partial_sums], axis=0, dtype=np.uint64)
+    
+    mse_values[valid] = sum_sq / num_pixels
+    mae_values[valid] = sum_abs / num_pixels
+    
+    return mse_values, mae_values
+
+
 def calculate_errors(original, decompressed_results, compressed_results, output_dir=None):
     """
     Calculate error metrics for all quality levels.
     
     Args:
         original: Original image as numpy array
-        decompressed_results: List of (quality, array, path) tuples
-        compressed_results: List of (quality, path, size) tuples
+        decompressed_results: DecompressResults from decompress_task
+        compressed_results: CompressResults from compress_task
         output_dir: Output directory for CSV (defaults to METRICS_DIR)
     
     Returns:
@@ -84,51 +175,77 @@ def calculate_errors(original, decompressed_results, compressed_results, output_
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
     
+    # Deferred so pandas is not imported at CLI startup
+    import pandas as pd
+    
     logger.info("Calculating error metrics for all quality levels")
     
-    # Create mapping from quality to file size
-    size_map = {q: size for q, _, size in compressed_results}
+    # Both result sets are sorted by quality, so look sizes up by position
+    qualities = decompressed_results.qualities
+    size_index = np.searchsorted(compressed_results.qualities, qualities)
+    compressed_sizes = compressed_results.sizes[size_index]
     
     # Calculate original image size (in bytes)
     original_size = original.nbytes
     
-    # Collect metrics
-    metrics_data = []
-    
-    for quality, decompressed_array, _ in decompressed_results:
-        # Calculate errors
-        mse = calculate_mse(original, decompressed_array)
-        mae = calculate_mae(original, decompressed_array)
-        
-        # Get compressed file size
-        compressed_size = size_map.get(quality, 0)
-        
-        # Calculate compression ratio
-        compression_ratio = original_size / compressed_size if compressed_size > 0 else 0
-        
-        # Convert size to KB
-        size_kb = compressed_size / 1024
-        
-        metrics_data.append({
-            "Quality": quality,
-            "MSE": mse,
-            "MAE": mae,
-            "FileSize_KB": size_kb,
-            "CompressionRatio": compression_ratio,
-        })
-        
+    # Calculate errors for all quality levels in one vectorized pass
+    mse_values, mae_values = calculate_errors_batch(original, decompressed_results.arrays)
+    
+    # Derive the remaining metric columns as whole arrays
+    size_kb_values = compressed_sizes / 1024
+    compression_ratios = np.zeros(len(compressed_sizes), dtype=np.float64)
+    np.divide(original_size, compressed_sizes, out=compression_ratios, where=compressed_sizes > 0)
+    
+    for quality, mse, mae, size_kb, compression_ratio in zip(
+        qualities, mse_values, mae_values, size_kb_values, compression_ratios
+    ):
         logger.info(
             f"Q={quality}: MSE={mse:.4f}, MAE={mae:.4f}, "
             f"Size={size_kb:.2f}KB, Ratio={compression_ratio:.2f}x"
         )
     
-    # Create DataFrame
-    df = pd.DataFrame(metrics_data, columns=METRIC_COLUMNS)
-    df = df.sort_values("Quality")
+    # Create DataFrame directly from the column arrays (already sorted by quality)
+    df = pd.DataFrame({
+        "Quality": qualities,
+        "MSE": mse_values,
+        "MAE": mae_values,
+        "FileSize_KB": size_kb_values,
+        "CompressionRatio": compression_ratios,
+    }, columns=METRIC_COLUMNS)
     
     # Save to CSV
     csv_path = output_dir / get_metrics_filename()
     df.to_csv(csv_path, index=False)
     logger.info(f"Metrics saved to {csv_path}")
     
+    # Also save as Parquet (binary columns, compact dtypes) when available
+    save_metrics_parquet(df, csv_path.with_suffix(".parquet"))
+    
     return df
+
+
+def save_metrics_parquet(df, parquet_path):
+    """
+    Save metrics as a zstd-compressed Parquet file if pyarrow is installed.
+    
+    Args:
+        df: DataFrame with error metrics
+        parquet_path: Output Parquet file path
+    
+    Returns:
+        bool: True if the file was written
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        logger.info("pyarrow not installed - skipping Parquet metrics export")
+        return False
+    
+    df.astype(METRIC_DTYPES).to_parquet(
+        parquet_path,
+        engine="pyarrow",
+        compression="zstd",
+        index=False
+    )
+    logger.info(f"Metrics saved to {parquet_path}")
+    return True
@@ -5,7 +5,6 @@ Author: Yair Levi
 
 from pathlib import Path
 import numpy as np
-import matplotlib.pyplot as plt
 
 from ..utils.logger import get_logger
 from ..utils.config import (
@@ -17,13 +16,43 @@ from ..utils.config import (
 logger = get_logger(__name__)
 
 
+# Shared figure reused by every histogram (created on first use)
+_histogram_figure = None
+
+
+def get_histogram_axes():
+    """
+    Return the shared histogram figure and its freshly cleared axes.
+    
+    The figure is drawn through FigureCanvasAgg directly, bypassing pyplot's
+    global state, and is built only once so figure creation and font setup
+    are not repeated per plot. matplotlib is imported on first use.
+    
+    Returns:
+        Tuple of (Figure, Axes)
+    """
+    global _histogram_figure
+    
+    if _histogram_figure is None:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        
+        _histogram_figure = Figure(figsize=HISTOGRAM_FIGSIZE_SINGLE)
+        FigureCanvasAgg(_histogram_figure)
+        _histogram_figure.subplots()
+    
+    ax = _histogram_figure.axes[0]
+    ax.clear()
+    return _histogram_figure, ax
+
+
 def create_file_size_histogram(original_size, compressed_results, output_dir=None):
     """
     Create file size histogram comparing original vs compressed at different Q levels.
     
     Args:
         original_size: Original image size in bytes
-        compressed_results: List of (quality, path, size) tuples
+        compressed_results: CompressResults from compress_task
         output_dir: Output directory (defaults to PLOTS_DIR)
     """
     if output_dir is None:
@@ -34,24 +63,21 @@ def create_file_size_histogram(original_size, compressed_results, output_dir=Non
     
     logger.info("Creating file size histogram")
     
-    # Sort by quality
-    sorted_results = sorted(compressed_results, key=lambda x: x[0])
-    
-    # Extract quality levels and file sizes
-    qualities = [q for q, _, _ in sorted_results]
-    file_sizes_kb = [size / 1024 for _, _, size in sorted_results]
-    
-    # Original size in KB
-    original_size_kb = original_size / 1024
+    # Extract quality levels and file sizes in quality order
+    order = np.argsort(compressed_results.qualities)
+    qualities = compressed_results.qualities[order]
     
-    # Create figure
-    fig, ax = plt.subplots(figsize=HISTOGRAM_FIGSIZE_SINGLE)
+    # Reuse the shared figure
+    fig, ax = get_histogram_axes()
     
     # Create bar positions
-    x_positions = list(range(len(qualities) + 1))
+    x_positions = np.arange(len(qualities) + 1)
     
-    # Prepare data: [Original, Q10, Q20, ..., Q95]
-    all_sizes = [original_size_kb] + file_sizes_kb
+    # Prepare data in KB: [Original, Q10, Q20, ..., Q95]
+    all_sizes = np.empty(len(qualities) + 1, dtype=np.float64)
+    all_sizes[0] = original_size
+    all_sizes[1:] = compressed_results.sizes[order]
+    all_sizes /= 1024
     labels = ['Original'] + [f'Q{q}' for q in qualities]
     colors = ['blue'] + ['red'] * len(qualities)
     
@@ -68,11 +94,7 @@ def create_file_size_histogram(original_size, compressed_results, output_dir=Non
     ax.grid(True, alpha=0.3, axis='y')
     
     # Add value labels on top of bars
-    for i, (bar, size) in enumerate(zip(bars, all_sizes)):
-        height = bar.get_height()
-        ax.text(bar.get_x() + bar.get_width()/2., height,
-                f'{size:.1f}',
-                ha='center', va='bottom', fontsize=8)
+    ax.bar_label(bars, fmt='%.1f', padding=2, fontsize=8)
     
     # Add legend
     from matplotlib.patches import Patch
@@ -84,9 +106,8 @@ def create_file_size_histogram(original_size, compressed_results, output_dir=Non
     
     # Save plot
     plot_path = output_dir / 'file_size_histogram.png'
-    plt.tight_layout()
-    plt.savefig(plot_path, dpi=HISTOGRAM_DPI)
-    plt.close()
+    fig.tight_layout()
+    fig.savefig(plot_path, dpi=HISTOGRAM_DPI)
     logger.info(f"Saved file size histogram: {plot_path.name}")
 
 
@@ -106,12 +127,12 @@ def create_error_histogram(metrics_df, output_dir=None):
     
     logger.info("Creating error histogram")
     
-    # Create figure
-    fig, ax = plt.subplots(figsize=HISTOGRAM_FIGSIZE_SINGLE)
+    # Reuse the shared figure
+    fig, ax = get_histogram_axes()
     
     # Create bar chart for MSE
-    qualities = metrics_df['Quality'].values
-    mse_values = metrics_df['MSE'].values
+    qualities = metrics_df['Quality'].to_numpy()
+    mse_values = metrics_df['MSE'].to_numpy()
     
     bars = ax.bar(qualities, mse_values, width=8, color='orange', 
                    alpha=0.7, edgecolor='black', label='MSE')
@@ -126,20 +147,15 @@ def create_error_histogram(metrics_df, output_dir=None):
     
     # Set x-axis ticks to show all quality levels
     ax.set_xticks(qualities)
-    ax.set_xticklabels([f'{int(q)}' for q in qualities])
+    ax.set_xticklabels(qualities.astype(str))
     
     # Add value labels on top of bars
-    for bar, mse in zip(bars, mse_values):
-        height = bar.get_height()
-        ax.text(bar.get_x() + bar.get_width()/2., height,
-                f'{mse:.2f}',
-                ha='center', va='bottom', fontsize=8, rotation=0)
+    ax.bar_label(bars, fmt='%.2f', padding=2, fontsize=8)
     
     # Save plot
     plot_path = output_dir / 'error_histogram.png'
-    plt.tight_layout()
-    plt.savefig(plot_path, dpi=HISTOGRAM_DPI)
-    plt.close()
+    fig.tight_layout()
+    fig.savefig(plot_path, dpi=HISTOGRAM_DPI)
     logger.info(f"Saved error histogram: {plot_path.name}")
 
 
@@ -0,0 +1,6 @@
+"""
+Test suite for JPEG Compression Analysis Tool.
+Author: Yair Levi
+"""
+
+# Test package initialization
@@ -0,0 +1,45 @@
+"""
+Unit tests for command-line argument handling.
+Author: Yair Levi
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add the directory containing the package to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from Lesson33_jpeg_compressing.main import parse_quality_levels
+
+
+class TestParseQualityLevels:
+    """Test --quality-levels parsing."""
+    
+    def test_sorted_levels(self):
+        """Test that levels come back sorted."""
+        assert parse_quality_levels("50,10,90") == [10, 50, 90]
+    
+    def test_whitespace_and_empty_items(self):
+        """Test spaces around values and trailing commas."""
+        assert parse_quality_levels(" 20 , 40,,60, ") == [20, 40, 60]
+    
+    def test_duplicates_removed(self):
+        """Test that repeated levels are compressed once."""
+        assert parse_quality_levels("30,30,10,30") == [10, 30]
+    
+    def test_out_of_range_dropped(self):
+        """Test that levels outside 1-100 are ignored."""
+        assert parse_quality_levels("0,1,100,101,-5") == [1, 100]
+    
+    def test_no_valid_level(self):
+        """Test that an empty result is an error."""
+        with pytest.raises(ValueError):
+            parse_quality_levels("0,150")
+        with pytest.raises(ValueError):
+            parse_quality_levels("")
+    
+    def test_non_integer(self):
+        """Test that non-numeric values are rejected."""
+        with pytest.raises(ValueError):
+            parse_quality_levels("10,high")
@@ -39,9 +39,22 @@ HISTOGRAM_GRID_COLS = 5
 SUPPORTED_FORMATS = [".jpg", ".jpeg", ".png", ".bmp", ".tiff", ".tif"]
 JPEG_FORMAT = "JPEG"
 PNG_FORMAT = "PNG"
+PNG_COMPRESS_LEVEL = 1  # zlib level for decompressed PNGs (near store speed)
+DECOMPRESSED_SAVE_FORMAT = "png"  # "png" or "npy" (raw numpy array)
+
+# Optional GPU decoding (used only when torchvision + CUDA are available)
+GPU_DECODE_MIN_IMAGES = 4
 
 # Metrics
+ERROR_TILE_BYTES = 1 << 20  # Working set per error-reduction tile (fits in L2)
 METRIC_COLUMNS = ["Quality", "MSE", "MAE", "FileSize_KB", "CompressionRatio"]
+METRIC_DTYPES = {  # Column types for the Parquet export
+    "Quality": "int8",
+    "MSE": "float32",
+    "MAE": "float32",
+    "FileSize_KB": "float32",
+    "CompressionRatio": "float32",
+}
 
 
 def create_directories():
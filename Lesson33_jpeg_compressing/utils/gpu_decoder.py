@@ -0,0 +1,64 @@
+"""
+Optional GPU JPEG decoder (nvJPEG through torchvision).
+Author: Yair Levi
+"""
+
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def gpu_decode_available():
+    """
+    Check (once) whether torchvision and a CUDA device are available.
+
+    torch is imported here rather than at module import so it does not
+    slow down CLI startup or runs that never reach the GPU path.
+
+    Returns:
+        bool: True if batched GPU JPEG decoding can be used
+    """
+    try:
+        import torch
+        import torchvision.io  # noqa: F401
+    except ImportError:
+        return False
+    return torch.cuda.is_available()
+
+
+def decode_jpegs_gpu(encoded_images):
+    """
+    Decode several JPEG images in one batched nvJPEG call.
+
+    Args:
+        encoded_images: List of encoded JPEG bytes
+
+    Returns:
+        List of numpy arrays shaped like Pillow's output ((H, W) or (H, W, C))
+
+    Raises:
+        RuntimeError: If no CUDA device / torchvision is available
+    """
+    if not gpu_decode_available():
+        raise RuntimeError("GPU JPEG decoding is not available")
+
+    import torch
+    from torchvision.io import decode_jpeg
+
+    # Wrap the encoded bytes as host tensors
+    encoded = [
+        torch.frombuffer(bytearray(data), dtype=torch.uint8)
+        for data in encoded_images
+    ]
+
+    # Batched decode on the device, then a single copy back per image
+    decoded = decode_jpeg(encoded, device="cuda")
+
+    arrays = []
+    for tensor in decoded:
+        # CHW -> HWC, dropping the channel axis for grayscale images
+        tensor = tensor.permute(1, 2, 0)
+        if tensor.shape[2] == 1:
+            tensor = tensor[:, :, 0]
+        arrays.append(tensor.contiguous().cpu().numpy())
+
+    return arrays
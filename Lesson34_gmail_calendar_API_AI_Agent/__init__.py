@@ -13,8 +13,26 @@ __version__ = "1.0.0"
 __author__ = "Yair Levi"
 __email__ = "yair0@example.com"
 
-from .main import main
-from .tasks import run_one_time_mode, run_polling_mode
+import os
+import sys
+
+# The modules import each other by flat name ('import config'), as when
+# main.py runs as a script. Import them the same way here, so each module
+# is loaded once instead of again under this package's name.
+_package_dir = os.path.dirname(os.path.abspath(__file__))
+if _package_dir not in sys.path:
+    sys.path.insert(0, _package_dir)
+
+from main import main
+
+
+def __getattr__(name):
+    """Import the task runners on first use (they load the API clients)."""
+    if name in ('run_one_time_mode', 'run_polling_mode'):
+        import tasks
+        return getattr(tasks, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     'main',
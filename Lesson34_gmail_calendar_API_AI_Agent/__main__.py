@@ -0,0 +1,10 @@
+"""
+Entry point when running as a package: python -m Lesson34_gmail_calendar_API_AI_Agent
+Author: Yair Levi
+"""
+
+# The package __init__ has put this directory on sys.path
+from main import main
+
+if __name__ == "__main__":
+    main()
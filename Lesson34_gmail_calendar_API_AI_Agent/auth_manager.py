@@ -7,11 +7,28 @@ Author: Yair Levi
 
 import os
 import pickle
+import threading
+from functools import lru_cache
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
+from googleapiclient.http import build_http
+from googleapiclient.model import JsonModel
 import logger_setup
 
+# orjson is optional; it parses the JSON token file and the Gmail/Calendar
+# API responses faster than the stdlib
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    json_loads = orjson.loads
+else:
+    from json import loads as json_loads
+
 logger = logger_setup.get_logger()
 
 SCOPES = [
@@ -20,23 +37,72 @@ SCOPES = [
     'https://www.googleapis.com/auth/calendar'
 ]
 
+# token path -> (token file mtime, credentials); a rewritten token file
+# (different mtime) forces a reload
+credentials_cache = {}
+
+# Single-flight guard: concurrent callers wait for one load/refresh/OAuth
+# flow instead of each starting their own
+credentials_lock = threading.Lock()
+
+
+def get_token_mtime(token_path):
+    """Return the token file's mtime in ns, or None if it does not exist."""
+    try:
+        return os.stat(token_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
 
 def get_google_credentials():
     """
-    Load or create Google API credentials.
+    Load or create Google API credentials (thread-safe).
+    
+    Credentials are cached per process; the token file is only read again
+    if its mtime changed, and refreshed only once they expire.
+    
+    Returns:
+        Google OAuth2 credentials
+    """
+    with credentials_lock:
+        return load_google_credentials()
+
+
+def load_google_credentials():
+    """
+    Load, refresh or create Google API credentials.
+    
+    Callers should use get_google_credentials, which serializes access.
     
     Returns:
         Google OAuth2 credentials
     """
     creds = None
+    needs_save = False
     creds_dir = os.path.join(os.path.dirname(__file__), 'credentials')
-    token_path = os.path.join(creds_dir, 'token.pickle')
+    token_path = os.path.join(creds_dir, 'token.json')
+    legacy_token_path = os.path.join(creds_dir, 'token.pickle')
     credentials_path = os.path.join(creds_dir, 'credentials.json')
     
-    if os.path.exists(token_path):
-        logger.info("Loading existing credentials from token.pickle")
+    token_mtime = get_token_mtime(token_path)
+    cached = credentials_cache.get(token_path)
+    if cached and cached[0] == token_mtime:
+        creds = cached[1]
+        if creds.valid:
+            logger.debug("Using cached Google credentials")
+            return creds
+    elif token_mtime is not None:
+        logger.info("Loading existing credentials from token.json")
         with open(token_path, 'rb') as token:
+            creds = Credentials.from_authorized_user_info(
+                json_loads(token.read()), SCOPES
+            )
+    elif os.path.exists(legacy_token_path):
+        # One-time migration of a token saved by older versions
+        logger.info("Migrating credentials from token.pickle to token.json")
+        with open(legacy_token_path, 'rb') as token:
             creds = pickle.load(token)
+        needs_save = True
     
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
@@ -53,18 +119,69 @@ def get_google_credentials():
                 credentials_path, SCOPES
             )
             creds = flow.run_local_server(port=0)
-        
-        logger.info("Saving credentials to token.pickle")
-        with open(token_path, 'wb') as token:
-            pickle.dump(creds, token)
+        needs_save = True
     
+    if needs_save:
+        logger.info("Saving credentials to token.json")
+        with open(token_path, 'w') as token:
+            token.write(creds.to_json())
+        token_mtime = get_token_mtime(token_path)
+    
+    credentials_cache[token_path] = (token_mtime, creds)
     logger.info("Google credentials ready")
     return creds
 
 
+@lru_cache(maxsize=4)
+def get_authorized_http(credentials):
+    """
+    Get a shared authorized HTTP transport for the given credentials.
+    
+    Gmail and Calendar services built on the same transport reuse its
+    keep-alive connections instead of each opening their own.
+    
+    The inner Http comes from googleapiclient's build_http, so it keeps the
+    library's defaults (60 s socket timeout, 308 not followed as a redirect)
+    that build() would have applied to its own transport.
+    
+    Args:
+        credentials: Google OAuth2 credentials
+    
+    Returns:
+        AuthorizedHttp wrapping a single httplib2.Http
+    """
+    logger.debug("Creating shared authorized HTTP transport")
+    return AuthorizedHttp(credentials, http=build_http())
+
+
+class OrjsonModel(JsonModel):
+    """JsonModel that parses API responses with orjson (straight from bytes)."""
+    
+    def deserialize(self, content):
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # Not JSON: let JsonModel return the raw text as before
+            return super().deserialize(content)
+        if self._data_wrapper and isinstance(body, dict) and 'data' in body:
+            body = body['data']
+        return body
+
+
+def get_api_model():
+    """
+    Get the request/response model for building Google API services.
+    
+    Returns:
+        OrjsonModel if orjson is installed, else None (library default)
+    """
+    return OrjsonModel() if orjson is not None else None
+
+
+@lru_cache(maxsize=1)
 def get_anthropic_api_key():
     """
-    Load Anthropic API key from file.
+    Load Anthropic API key from file (read once per process).
     
     Returns:
         Anthropic API key string
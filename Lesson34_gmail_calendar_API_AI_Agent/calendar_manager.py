@@ -6,50 +6,149 @@ Author: Yair Levi
 """
 
 from datetime import datetime
+from functools import lru_cache
+import pytz
 from googleapiclient.discovery import build
+import auth_manager
 import logger_setup
 
 logger = logger_setup.get_logger()
 
+# Event summaries per (start, end, timezone) window, filled during a scan
+duplicate_cache = {}
 
+# Calendar accepts at most 50 calls per batch HTTP request
+CALENDAR_BATCH_SIZE = 50
+
+
+@lru_cache(maxsize=4)
 def build_calendar_service(credentials):
-    """Build Calendar API service."""
+    """
+    Build Calendar API service (cached per credentials).
+    
+    Uses the discovery document bundled with google-api-python-client
+    and the shared authorized transport, so no network fetch happens here.
+    """
     logger.debug("Building Calendar service")
-    return build('calendar', 'v3', credentials=credentials)
+    return build(
+        'calendar', 'v3',
+        http=auth_manager.get_authorized_http(credentials),
+        model=auth_manager.get_api_model(),
+        static_discovery=True,
+        cache_discovery=False
+    )
+
+
+def reset_duplicate_cache():
+    """Clear cached event windows (call at the start of every scan)."""
+    duplicate_cache.clear()
+
+
+def get_duplicate_cache_key(event_body):
+    """Return the cache key identifying an event's time window."""
+    return (
+        event_body['start']['dateTime'],
+        event_body['end']['dateTime'],
+        event_body['start'].get('timeZone', 'UTC'),
+    )
+
+
+@lru_cache(maxsize=64)
+def get_timezone(timezone_str):
+    """Return cached pytz timezone (avoids re-reading zoneinfo per call)."""
+    return pytz.timezone(timezone_str)
+
+
+def parse_event_datetime(value):
+    """
+    Parse 'YYYY-MM-DDTHH:MM:SS' strings built by format_event_for_api.
+    
+    Uses positional slicing for the fixed 19-character layout and falls
+    back to strptime for anything else (e.g. single-digit hours from Claude).
+    """
+    if (len(value) == 19 and value[4] == '-' and value[7] == '-'
+            and value[10] == 'T' and value[13] == ':' and value[16] == ':'):
+        return datetime(
+            int(value[0:4]), int(value[5:7]), int(value[8:10]),
+            int(value[11:13]), int(value[14:16]), int(value[17:19])
+        )
+    return datetime.strptime(value, '%Y-%m-%dT%H:%M:%S')
+
+
+def remember_event(event_body):
+    """Add event to its cached window so later emails in this scan see it."""
+    summaries = duplicate_cache.get(get_duplicate_cache_key(event_body))
+    if summaries is not None:
+        summaries.add(event_body['summary'])
 
 
-def create_event(service, meeting_data, timezone='UTC'):
+def create_events_bulk(service, event_bodies):
     """
-    Create calendar event from meeting data.
+    Create several calendar events using Calendar batch requests.
+    
+    Duplicates (already in the calendar or earlier in event_bodies) are
+    skipped; the rest are inserted with up to CALENDAR_BATCH_SIZE calls
+    per HTTP round trip.
     
     Args:
         service: Calendar API service
-        meeting_data: Dictionary with meeting details
-        timezone: Timezone string
+        event_bodies: List of event dictionaries from format_event_for_api
     
     Returns:
-        Created event object
+        List aligned with event_bodies: created event, None for a
+        duplicate, or the exception raised for a failed insert
     """
-    event_body = format_event_for_api(meeting_data, timezone)
+    results = [None] * len(event_bodies)
+    pending = []
+    queued = set()
     
-    if check_duplicate_event(service, event_body):
-        logger.warning(f"Event already exists: {meeting_data['subject']}")
-        return None
+    for index, event_body in enumerate(event_bodies):
+        if check_duplicate_event(service, event_body):
+            logger.warning(f"Event already exists: {event_body['summary']}")
+            continue
+        # Skip a repeat later in this call; the duplicate cache itself is
+        # only updated once the insert has succeeded
+        queued_key = (get_duplicate_cache_key(event_body), event_body['summary'])
+        if queued_key in queued:
+            logger.info(f"Duplicate event found: {event_body['summary']}")
+            continue
+        queued.add(queued_key)
+        pending.append(index)
     
-    logger.info(f"Creating calendar event: {meeting_data['subject']}")
+    def on_created(request_id, response, exception):
+        index = int(request_id)
+        if exception is not None:
+            logger.error(f"Failed to create event: {exception}")
+            results[index] = exception
+            return
+        logger.info(f"Event created successfully: {response.get('htmlLink')}")
+        remember_event(event_bodies[index])
+        results[index] = response
     
-    try:
-        event = service.events().insert(
-            calendarId='primary',
-            body=event_body
-        ).execute()
-        
-        logger.info(f"Event created successfully: {event.get('htmlLink')}")
-        return event
+    for start in range(0, len(pending), CALENDAR_BATCH_SIZE):
+        chunk = pending[start:start + CALENDAR_BATCH_SIZE]
+        logger.info(f"Creating {len(chunk)} calendar events in one batch")
         
-    except Exception as e:
-        logger.error(f"Failed to create event: {e}")
-        raise
+        batch = service.new_batch_http_request(callback=on_created)
+        for index in chunk:
+            batch.add(
+                service.events().insert(
+                    calendarId='primary',
+                    body=event_bodies[index]
+                ),
+                request_id=str(index)
+            )
+        try:
+            batch.execute()
+        except Exception as e:
+            # The whole round trip failed (HTTP or transport error); every
+            # event of this chunk without a callback result failed with it
+            logger.error(f"Calendar batch request failed: {e}")
+            for index in chunk:
+                if results[index] is None:
+                    results[index] = e
+    
+    return results
 
 
 def format_event_for_api(meeting_data, timezone):
@@ -67,7 +166,7 @@ def format_event_for_api(meeting_data, timezone):
     
     end_time = meeting_data.get('end_time')
     if not end_time:
-        start_dt = datetime.strptime(start_datetime, '%Y-%m-%dT%H:%M:%S')
+        start_dt = parse_event_datetime(start_datetime)
         from datetime import timedelta
         end_dt = start_dt + timedelta(hours=1)
         end_datetime = end_dt.strftime('%Y-%m-%dT%H:%M:%S')
@@ -96,31 +195,38 @@ def format_event_for_api(meeting_data, timezone):
 
 
 def check_duplicate_event(service, event_body):
-    """Check if similar event already exists."""
-    from datetime import datetime
-    import pytz
+    """
+    Check if similar event already exists.
     
-    start_time = event_body['start']['dateTime']
-    end_time = event_body['end']['dateTime']
-    timezone_str = event_body['start'].get('timeZone', 'UTC')
+    Event summaries of each queried time window are cached in-process, so
+    emails in the same scan that share a window cost one events().list call.
+    """
+    cache_key = get_duplicate_cache_key(event_body)
+    start_time, end_time, timezone_str = cache_key
     
     try:
-        tz = pytz.timezone(timezone_str)
-        start_dt = tz.localize(datetime.strptime(start_time, '%Y-%m-%dT%H:%M:%S'))
-        end_dt = tz.localize(datetime.strptime(end_time, '%Y-%m-%dT%H:%M:%S'))
-        
-        events_result = service.events().list(
-            calendarId='primary',
-            timeMin=start_dt.isoformat(),
-            timeMax=end_dt.isoformat(),
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
+        summaries = duplicate_cache.get(cache_key)
+        if summaries is None:
+            tz = get_timezone(timezone_str)
+            start_dt = tz.localize(parse_event_datetime(start_time))
+            end_dt = tz.localize(parse_event_datetime(end_time))
+            
+            events_result = service.events().list(
+                calendarId='primary',
+                timeMin=start_dt.isoformat(),
+                timeMax=end_dt.isoformat(),
+                singleEvents=True,
+                orderBy='startTime'
+            ).execute()
+            
+            summaries = {
+                event.get('summary') for event in events_result.get('items', [])
+            }
+            duplicate_cache[cache_key] = summaries
         
-        for event in events_result.get('items', []):
-            if event.get('summary') == event_body['summary']:
-                logger.info(f"Duplicate event found: {event_body['summary']}")
-                return True
+        if event_body['summary'] in summaries:
+            logger.info(f"Duplicate event found: {event_body['summary']}")
+            return True
         return False
     except Exception as e:
         logger.warning(f"Duplicate check failed: {e}")
@@ -9,6 +9,12 @@ import os
 import yaml
 import logger_setup
 
+# libyaml's C parser when PyYAML was built with it, pure Python otherwise
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 logger = logger_setup.get_logger()
 
 
@@ -29,7 +35,7 @@ def load_config(config_path=None):
     
     try:
         with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+            config = yaml.load(f, Loader=SafeLoader)
         
         validate_config(config)
         logger.info("Configuration loaded successfully")
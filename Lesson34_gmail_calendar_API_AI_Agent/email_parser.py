@@ -5,14 +5,38 @@ AI-powered extraction of meeting details from email content.
 Author: Yair Levi
 """
 
+import calendar
+import hashlib
 import json
+import os
 import re
+import sqlite3
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from anthropic import Anthropic
+from functools import lru_cache
+from anthropic import AsyncAnthropic
 import logger_setup
 
 logger = logger_setup.get_logger()
 
+CLAUDE_MODEL = "claude-sonnet-4-5-20250929"
+
+# Bump when the prompt or the meeting_data schema changes
+PARSE_CACHE_VERSION = 1
+PARSE_CACHE_SIZE = 1024
+
+# Parsed meeting data per email content hash (most recently used last)
+parse_cache = OrderedDict()
+
+# On-disk copy of the parse cache, so restarts do not re-send emails to Claude
+PARSE_CACHE_DB = os.path.join(os.path.dirname(__file__), 'cache', 'parse_cache.db')
+# Keys contain the date, so older rows can never be hit again
+PARSE_CACHE_MAX_AGE_SECONDS = 2 * 24 * 60 * 60
+
+# Markdown code fences Claude sometimes wraps the JSON in (``` or ```json)
+CODE_FENCE_PATTERN = re.compile(r'```(?:json)?\s*|\s*```')
+
 SYSTEM_PROMPT = """You are a specialized email parser that extracts meeting details.
 
 Extract the following information:
@@ -32,50 +56,152 @@ Rules:
 6. Extract all relevant context for description
 """
 
+# User prompt for meeting extraction (filled in by build_meeting_prompt)
+MEETING_PROMPT_TEMPLATE = """Analyze this email and extract meeting details:
+
+EMAIL CONTENT:
+{body}
 
-def initialize_claude_client(api_key):
-    """Initialize Anthropic client."""
-    logger.debug("Initializing Anthropic client")
-    return Anthropic(api_key=api_key)
+Return JSON with: {{"date": "YYYY-MM-DD or null", "start_time": "HH:MM or null", "end_time": "HH:MM or null", "subject": "string or null", "location": "string or null", "details": "string or null"}}
 
+CONTEXT: Current date: {date} ({day}). Convert DD/MM/YYYY to YYYY-MM-DD. Use 24-hour time. "Friday 30/1/2026" → "2026-01-30". "10:00 AM" → "10:00".
 
-def parse_email_for_meeting(client, email_body):
-    """Parse email to extract meeting details using Claude."""
-    from datetime import datetime
-    import calendar
+Return ONLY the JSON object."""
+
+# Only the start of the email body is sent to Claude
+MAX_EMAIL_BODY_CHARS = 2000
+
+
+def initialize_async_claude_client(api_key):
+    """Initialize async Anthropic client (for concurrent parsing)."""
+    logger.debug("Initializing async Anthropic client")
+    return AsyncAnthropic(api_key=api_key)
+
+
+def get_parse_cache_key(email_body):
+    """
+    Return the cache key for an email body.
+    
+    Whitespace is normalized; today's date is part of the key because
+    Claude resolves relative dates ("next Friday") against it.
+    """
+    normalized = ' '.join(email_body.split())
+    key_text = f"{PARSE_CACHE_VERSION}|{datetime.now():%Y-%m-%d}|{normalized}"
+    return hashlib.blake2b(key_text.encode('utf-8'), digest_size=16).digest()
+
+
+@lru_cache(maxsize=1)
+def get_parse_cache_db():
+    """
+    Open the on-disk parse cache (once per process).
     
+    Rows older than PARSE_CACHE_MAX_AGE_SECONDS are dropped on open.
+    
+    Returns:
+        sqlite3 connection
+    """
+    os.makedirs(os.path.dirname(PARSE_CACHE_DB), exist_ok=True)
+    db = sqlite3.connect(PARSE_CACHE_DB, check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS parse_cache ("
+        "key BLOB PRIMARY KEY, meeting_json TEXT NOT NULL, created INTEGER NOT NULL)"
+    )
+    db.execute(
+        "DELETE FROM parse_cache WHERE created < ?",
+        (int(time.time()) - PARSE_CACHE_MAX_AGE_SECONDS,)
+    )
+    db.commit()
+    logger.debug(f"Opened parse cache {PARSE_CACHE_DB}")
+    return db
+
+
+def get_cached_meeting(cache_key):
+    """Return a copy of cached meeting data, or None on a miss."""
+    meeting_data = parse_cache.get(cache_key)
+    if meeting_data is not None:
+        parse_cache.move_to_end(cache_key)
+    else:
+        try:
+            row = get_parse_cache_db().execute(
+                "SELECT meeting_json FROM parse_cache WHERE key = ?", (cache_key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Parse cache lookup failed: {e}")
+            row = None
+        if row is None:
+            return None
+        meeting_data = json.loads(row[0])
+        remember_meeting(cache_key, meeting_data)
+    logger.info("Using cached parse result (skipping Claude)")
+    return dict(meeting_data)
+
+
+def remember_meeting(cache_key, meeting_data):
+    """Keep meeting data in memory, evicting the least recently used entry."""
+    parse_cache[cache_key] = dict(meeting_data)
+    if len(parse_cache) > PARSE_CACHE_SIZE:
+        parse_cache.popitem(last=False)
+
+
+def cache_meeting(cache_key, meeting_data):
+    """Store parsed meeting data in memory and in the on-disk cache."""
+    remember_meeting(cache_key, meeting_data)
+    try:
+        db = get_parse_cache_db()
+        db.execute(
+            "INSERT OR REPLACE INTO parse_cache (key, meeting_json, created) "
+            "VALUES (?, ?, ?)",
+            (cache_key, json.dumps(meeting_data), int(time.time()))
+        )
+        db.commit()
+    except sqlite3.Error as e:
+        logger.warning(f"Failed to store parse result on disk: {e}")
+
+
+def build_meeting_prompt(email_body):
+    """Build the Claude prompt for extracting meeting details."""
     current_date = datetime.now()
-    current_date_str = current_date.strftime('%Y-%m-%d')
-    current_day = calendar.day_name[current_date.weekday()]
     
-    prompt = f"""Analyze this email and extract meeting details:
+    return MEETING_PROMPT_TEMPLATE.format(
+        body=email_body[:MAX_EMAIL_BODY_CHARS],
+        date=current_date.strftime('%Y-%m-%d'),
+        day=calendar.day_name[current_date.weekday()]
+    )
 
-EMAIL CONTENT:
-{email_body[:2000]}
 
-Return JSON with: {{"date": "YYYY-MM-DD or null", "start_time": "HH:MM or null", "end_time": "HH:MM or null", "subject": "string or null", "location": "string or null", "details": "string or null"}}
+def handle_claude_response(message):
+    """Extract and validate meeting data from a Claude message."""
+    response_text = message.content[0].text
+    logger.debug(f"Claude response: {response_text}")
+    
+    meeting_data = extract_meeting_data(response_text)
+    validate_meeting_data(meeting_data)
+    
+    return meeting_data
 
-CONTEXT: Current date: {current_date_str} ({current_day}). Convert DD/MM/YYYY to YYYY-MM-DD. Use 24-hour time. "Friday 30/1/2026" → "2026-01-30". "10:00 AM" → "10:00".
 
-Return ONLY the JSON object."""
+async def parse_email_for_meeting_async(client, email_body):
+    """Parse email to extract meeting details using an AsyncAnthropic client."""
+    cache_key = get_parse_cache_key(email_body)
+    cached = get_cached_meeting(cache_key)
+    if cached is not None:
+        return cached
+    
+    prompt = build_meeting_prompt(email_body)
     
     logger.info("Sending email to Claude for parsing")
     
     try:
-        message = client.messages.create(
-            model="claude-sonnet-4-5-20250929",
+        message = await client.messages.create(
+            model=CLAUDE_MODEL,
             max_tokens=1000,
             temperature=0,
             system=SYSTEM_PROMPT,
             messages=[{"role": "user", "content": prompt}]
         )
-        
-        response_text = message.content[0].text
-        logger.debug(f"Claude response: {response_text}")
-        
-        meeting_data = extract_meeting_data(response_text)
-        validate_meeting_data(meeting_data)
-        
+        meeting_data = handle_claude_response(message)
+        cache_meeting(cache_key, meeting_data)
         return meeting_data
         
     except Exception as e:
@@ -85,7 +211,7 @@ Return ONLY the JSON object."""
 
 def extract_meeting_data(response_text):
     """Extract JSON from Claude response."""
-    json_text = re.sub(r'```json\s*|\s*```', '', response_text)
+    json_text = CODE_FENCE_PATTERN.sub('', response_text)
     
     try:
         data = json.loads(json_text)
@@ -0,0 +1,65 @@
+"""
+Event Loop Module
+Runs the application's coroutines on one long-lived event loop,
+on uvloop when it is installed.
+
+Author: Yair Levi
+"""
+
+import asyncio
+
+# uvloop is optional (not available on Windows)
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+def new_event_loop():
+    """Create a uvloop event loop if uvloop is installed, else a standard one."""
+    if uvloop is None:
+        return asyncio.new_event_loop()
+    return uvloop.new_event_loop()
+
+
+class Runner:
+    """
+    Run coroutines one after another on the same event loop.
+
+    Same interface as asyncio.Runner (Python 3.11+): objects bound to the
+    loop, such as the async Claude client's connection pool, stay usable
+    from one run() to the next (e.g. across polling ticks). The loop comes
+    from new_event_loop(), so no global event loop policy is changed.
+    """
+
+    def __init__(self):
+        self.loop = new_event_loop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def run(self, coroutine):
+        """
+        Run a coroutine to completion on the runner's loop.
+
+        Args:
+            coroutine: Coroutine to run
+
+        Returns:
+            The coroutine's result
+        """
+        return self.loop.run_until_complete(coroutine)
+
+    def close(self):
+        """Shut down async generators and the default executor, then close the loop."""
+        if self.loop.is_closed():
+            return
+        try:
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            if hasattr(self.loop, 'shutdown_default_executor'):
+                self.loop.run_until_complete(self.loop.shutdown_default_executor())
+        finally:
+            self.loop.close()
@@ -6,105 +6,351 @@ Author: Yair Levi
 """
 
 import base64
+import re
 from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import islice
 from googleapiclient.discovery import build
-from bs4 import BeautifulSoup
+from googleapiclient.errors import HttpError
+from lxml import etree, html as lxml_html
+import auth_manager
 import logger_setup
 
 logger = logger_setup.get_logger()
 
+# Gmail accepts at most 100 calls per batch HTTP request
+GMAIL_BATCH_SIZE = 100
 
+# Partial response for messages.get: only what parse_email_message reads
+# (headers and the body data of the payload and its parts), so snippet,
+# labels, sizes and attachment metadata are not downloaded
+GMAIL_MESSAGE_FIELDS = (
+    'id,payload(mimeType,headers(name,value),body/data,parts(mimeType,body/data))'
+)
+
+# messages.list returns at most 500 messages per page
+GMAIL_LIST_PAGE_SIZE = 500
+
+# messages.batchModify accepts at most 1000 message IDs per call
+GMAIL_MODIFY_BATCH_SIZE = 1000
+
+# Leading <?xml ...?> declaration some mailers put in front of HTML bodies
+XML_DECLARATION_PATTERN = re.compile(r'^\s*<\?xml[^>]*\?>')
+
+
+@lru_cache(maxsize=4)
 def build_gmail_service(credentials):
-    """Build Gmail API service."""
+    """
+    Build Gmail API service (cached per credentials).
+    
+    Uses the bundled discovery document and the transport shared with
+    the Calendar service.
+    """
     logger.debug("Building Gmail service")
-    return build('gmail', 'v1', credentials=credentials)
+    return build(
+        'gmail', 'v1',
+        http=auth_manager.get_authorized_http(credentials),
+        model=auth_manager.get_api_model(),
+        static_discovery=True,
+        cache_discovery=False
+    )
 
 
-def search_emails(service, query, since_date):
+def iter_emails(service, query, since_date, page_size=GMAIL_LIST_PAGE_SIZE):
     """
-    Search for emails matching criteria since given date.
+    Yield emails matching criteria since given date, page by page.
+    
+    Follows nextPageToken, so matches beyond the first page are not
+    dropped; the next page is only requested once the caller has
+    consumed the current one.
     
     Args:
         service: Gmail API service
         query: Search query string
         since_date: Only emails after this date
+        page_size: Messages requested per page (max 500)
     
-    Returns:
-        List of email message objects
+    Yields:
+        Email message objects ({'id': ..., 'threadId': ...})
     """
     date_str = since_date.strftime('%Y/%m/%d')
     full_query = f"{query} after:{date_str}"
     
     logger.info(f"Searching emails with query: {full_query}")
     
+    messages_api = service.users().messages()
+    request = messages_api.list(
+        userId='me',
+        q=full_query,
+        maxResults=min(page_size, GMAIL_LIST_PAGE_SIZE)
+    )
     try:
-        results = service.users().messages().list(
-            userId='me',
-            q=full_query
-        ).execute()
-        
-        messages = results.get('messages', [])
-        logger.info(f"Found {len(messages)} matching emails")
-        return messages
-        
+        while request is not None:
+            response = request.execute()
+            yield from response.get('messages', [])
+            request = messages_api.list_next(request, response)
+            
     except Exception as e:
         logger.error(f"Gmail search failed: {e}")
         raise
 
 
-def get_email_content(service, email_id):
+def search_emails(service, query, since_date, max_results=None):
     """
-    Retrieve full email content.
+    Search for emails matching criteria since given date.
     
     Args:
         service: Gmail API service
-        email_id: Email message ID
+        query: Search query string
+        since_date: Only emails after this date
+        max_results: Stop after this many emails (None: all pages)
     
     Returns:
-        Dictionary with email metadata and body
+        List of email message objects
+    """
+    page_size = GMAIL_LIST_PAGE_SIZE
+    if max_results is not None:
+        page_size = max(1, min(max_results, page_size))
+    messages = list(islice(
+        iter_emails(service, query, since_date, page_size), max_results
+    ))
+    logger.info(f"Found {len(messages)} matching emails")
+    return messages
+
+
+def get_current_history_id(service):
+    """
+    Get the mailbox's current history ID (starting point for deltas).
+    
+    Args:
+        service: Gmail API service
+    
+    Returns:
+        History ID string
+    """
+    profile = service.users().getProfile(userId='me').execute()
+    return profile['historyId']
+
+
+def list_new_message_ids(service, start_history_id):
     """
-    logger.debug(f"Retrieving email {email_id}")
+    List messages added to the mailbox since the given history ID.
+    
+    Uses users.history.list, which returns only the changes since
+    start_history_id instead of re-running a full search.
+    
+    Args:
+        service: Gmail API service
+        start_history_id: Last seen history ID
+    
+    Returns:
+        Tuple of (list of new message IDs, latest history ID), or
+        (None, None) if start_history_id has expired and a full
+        search is needed
+    """
+    message_ids = []
+    history_id = start_history_id
+    page_token = None
     
     try:
-        message = service.users().messages().get(
+        while True:
+            response = service.users().history().list(
+                userId='me',
+                startHistoryId=start_history_id,
+                historyTypes=['messageAdded'],
+                pageToken=page_token
+            ).execute()
+            
+            for record in response.get('history', []):
+                for added in record.get('messagesAdded', []):
+                    message_ids.append(added['message']['id'])
+            
+            history_id = response.get('historyId', history_id)
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+                
+    except HttpError as e:
+        if e.resp.status == 404:
+            logger.warning("History ID expired, falling back to full search")
+            return None, None
+        logger.error(f"Gmail history fetch failed: {e}")
+        raise
+    
+    # The same message can appear in several history records
+    message_ids = list(dict.fromkeys(message_ids))
+    logger.debug(f"Found {len(message_ids)} new messages since history {start_history_id}")
+    return message_ids, history_id
+
+
+def start_watch(service, topic_name, label_ids=None):
+    """
+    Ask Gmail to publish mailbox changes to a Pub/Sub topic.
+    
+    A watch expires after 7 days and must be renewed before then.
+    
+    Args:
+        service: Gmail API service
+        topic_name: Full topic name (projects/<project>/topics/<topic>)
+        label_ids: Labels to watch (default: INBOX)
+    
+    Returns:
+        Watch response with 'historyId' and 'expiration'
+    """
+    logger.info(f"Starting Gmail watch on topic {topic_name}")
+    
+    try:
+        return service.users().watch(
             userId='me',
-            id=email_id,
-            format='full'
+            body={
+                'topicName': topic_name,
+                'labelIds': label_ids or ['INBOX'],
+                'labelFilterBehavior': 'INCLUDE'
+            }
         ).execute()
         
-        headers = message['payload'].get('headers', [])
-        subject = next(
-            (h['value'] for h in headers if h['name'] == 'Subject'),
-            'No Subject'
-        )
-        
-        body = extract_email_body(message['payload'])
-        
-        return {
-            'id': email_id,
-            'subject': subject,
-            'body': body
-        }
-        
     except Exception as e:
-        logger.error(f"Failed to retrieve email {email_id}: {e}")
+        logger.error(f"Gmail watch failed: {e}")
         raise
 
 
+def stop_watch(service):
+    """Stop Gmail push notifications for the mailbox."""
+    try:
+        service.users().stop(userId='me').execute()
+        logger.info("Gmail watch stopped")
+    except Exception as e:
+        logger.warning(f"Failed to stop Gmail watch: {e}")
+
+
+def batch_get_email_contents(service, email_ids):
+    """
+    Retrieve full content of several emails using Gmail batch requests.
+    
+    Up to GMAIL_BATCH_SIZE messages.get calls are sent per HTTP round trip
+    instead of one round trip per email.
+    
+    Args:
+        service: Gmail API service
+        email_ids: List of email message IDs
+    
+    Returns:
+        List of email dictionaries (same order as email_ids, failures skipped)
+    """
+    contents = {}
+    
+    def on_message(request_id, response, exception):
+        if exception is not None:
+            logger.error(f"Failed to retrieve email {request_id}: {exception}")
+            return
+        try:
+            contents[request_id] = parse_email_message(response, request_id)
+        except Exception as e:
+            logger.error(f"Failed to parse email {request_id}: {e}")
+    
+    for start in range(0, len(email_ids), GMAIL_BATCH_SIZE):
+        chunk = email_ids[start:start + GMAIL_BATCH_SIZE]
+        logger.debug(f"Retrieving batch of {len(chunk)} emails")
+        
+        batch = service.new_batch_http_request(callback=on_message)
+        for email_id in chunk:
+            batch.add(
+                service.users().messages().get(
+                    userId='me',
+                    id=email_id,
+                    format='full',
+                    fields=GMAIL_MESSAGE_FIELDS
+                ),
+                request_id=email_id
+            )
+        batch.execute()
+    
+    return [contents[email_id] for email_id in email_ids if email_id in contents]
+
+
+def get_message_dates(service, email_ids):
+    """
+    Retrieve the receive time of several emails using Gmail batch requests.
+    
+    Only internalDate is requested, so this costs a few bytes per email.
+    
+    Args:
+        service: Gmail API service
+        email_ids: List of email message IDs
+    
+    Returns:
+        Dictionary of email ID to receive time in epoch seconds
+        (failures skipped)
+    """
+    dates = {}
+    
+    def on_message(request_id, response, exception):
+        if exception is not None:
+            logger.error(f"Failed to retrieve email {request_id}: {exception}")
+            return
+        dates[request_id] = int(response['internalDate']) // 1000
+    
+    for start in range(0, len(email_ids), GMAIL_BATCH_SIZE):
+        chunk = email_ids[start:start + GMAIL_BATCH_SIZE]
+        
+        batch = service.new_batch_http_request(callback=on_message)
+        for email_id in chunk:
+            batch.add(
+                service.users().messages().get(
+                    userId='me',
+                    id=email_id,
+                    format='minimal',
+                    fields='internalDate'
+                ),
+                request_id=email_id
+            )
+        batch.execute()
+    
+    return dates
+
+
+def parse_email_message(message, email_id):
+    """
+    Build email dictionary from a Gmail API message resource.
+    
+    Args:
+        message: Message resource returned by messages.get (format='full')
+        email_id: Email message ID
+    
+    Returns:
+        Dictionary with email metadata and body
+    """
+    headers = message['payload'].get('headers', [])
+    subject = next(
+        (h['value'] for h in headers if h['name'] == 'Subject'),
+        'No Subject'
+    )
+    
+    body = extract_email_body(message['payload'])
+    
+    return {
+        'id': email_id,
+        'subject': subject,
+        'body': body
+    }
+
+
 def extract_email_body(payload):
     """Extract and clean email body from payload."""
     body = ''
     
     if 'parts' in payload:
         for part in payload['parts']:
-            if part['mimeType'] == 'text/plain':
-                body = decode_body(part['body'].get('data', ''))
+            # The partial response omits 'body' (and 'mimeType') when empty
+            mime_type = part.get('mimeType')
+            if mime_type == 'text/plain':
+                body = decode_body(part.get('body', {}).get('data', ''))
                 break
-            elif part['mimeType'] == 'text/html':
-                html = decode_body(part['body'].get('data', ''))
+            elif mime_type == 'text/html':
+                html = decode_body(part.get('body', {}).get('data', ''))
                 body = clean_html(html)
-    elif 'body' in payload:
-        body = decode_body(payload['body'].get('data', ''))
+    else:
+        body = decode_body(payload.get('body', {}).get('data', ''))
     
     return body
 
@@ -117,25 +363,50 @@ def decode_body(data):
 
 
 def clean_html(html_text):
-    """Remove HTML tags from email body."""
-    soup = BeautifulSoup(html_text, 'html.parser')
-    return soup.get_text(separator=' ', strip=True)
+    """Remove HTML tags from email body (libxml2 parser, whitespace collapsed)."""
+    # lxml refuses str input that carries an <?xml encoding=...?> declaration;
+    # the body is already decoded, so the declaration can simply be dropped
+    html_text = XML_DECLARATION_PATTERN.sub('', html_text, count=1)
+    try:
+        document = lxml_html.fromstring(html_text)
+    except etree.ParserError:
+        # Empty or whitespace-only document
+        return ''
+    # Style sheets and scripts are not part of the readable text
+    etree.strip_elements(document, 'script', 'style', with_tail=False)
+    # Join text nodes with a space so adjacent cells/blocks stay separate words
+    return ' '.join(' '.join(document.itertext()).split())
 
 
-def mark_as_read(service, email_id):
-    """Mark email as read."""
-    logger.debug(f"Marking email {email_id} as read")
+def mark_emails_as_read(service, email_ids):
+    """
+    Mark several emails as read with messages.batchModify.
+    
+    One API call per GMAIL_MODIFY_BATCH_SIZE emails instead of one
+    messages.modify round trip per email.
+    
+    Args:
+        service: Gmail API service
+        email_ids: List of email message IDs
+    
+    Returns:
+        True if all emails were marked read
+    """
+    logger.debug(f"Marking {len(email_ids)} emails as read")
     
     try:
-        service.users().messages().modify(
-            userId='me',
-            id=email_id,
-            body={'removeLabelIds': ['UNREAD']}
-        ).execute()
+        for start in range(0, len(email_ids), GMAIL_MODIFY_BATCH_SIZE):
+            service.users().messages().batchModify(
+                userId='me',
+                body={
+                    'ids': email_ids[start:start + GMAIL_MODIFY_BATCH_SIZE],
+                    'removeLabelIds': ['UNREAD']
+                }
+            ).execute()
         return True
         
     except Exception as e:
-        logger.warning(f"Failed to mark email {email_id} as read: {e}")
+        logger.warning(f"Failed to mark {len(email_ids)} emails as read: {e}")
         return False
 
 
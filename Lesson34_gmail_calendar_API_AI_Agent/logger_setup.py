@@ -1,13 +1,24 @@
 """
 Logging Setup Module
 Configures ring buffer logging system with 20 files, 16MB each.
+File writes and rotation run on a background QueueListener thread.
 
 Author: Yair Levi
 """
 
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Background thread that drains queued records into the log file
+log_listener = None
+
+# The log format has no %(thread)d/%(threadName)s/%(process)d, so skip
+# collecting them for every record (%(processName)s is still filled in)
+logging.logThreads = False
+logging.logProcesses = False
 
 
 def setup_logger(name='gmail_scanner', log_level='INFO'):
@@ -21,6 +32,8 @@ def setup_logger(name='gmail_scanner', log_level='INFO'):
     Returns:
         Configured logger instance
     """
+    global log_listener
+    
     logger = logging.getLogger(name)
     logger.setLevel(getattr(logging, log_level.upper()))
     
@@ -49,7 +62,16 @@ def setup_logger(name='gmail_scanner', log_level='INFO'):
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
     
-    logger.addHandler(file_handler)
+    # The caller only enqueues the record; the listener thread does the
+    # file write and any rotation. The console stays direct so log lines
+    # keep their order relative to print() output.
+    log_queue = queue.SimpleQueue()
+    log_listener = QueueListener(log_queue, file_handler)
+    log_listener.start()
+    # Flush whatever is still queued on interpreter exit
+    atexit.register(log_listener.stop)
+    
+    logger.addHandler(QueueHandler(log_queue))
     logger.addHandler(console_handler)
     
     return logger
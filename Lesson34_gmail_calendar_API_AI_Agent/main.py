@@ -5,36 +5,68 @@ Gmail Event Scanner & Calendar Integration
 Author: Yair Levi
 """
 
+import argparse
+import asyncio
+import signal
 import sys
 import os
+import threading
 
 # Add current directory to Python path to enable imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+# Only the light modules are imported up front; the Google and Anthropic
+# client libraries are imported when initialization needs them, so
+# --help and argument errors return immediately
 import config
-import auth_manager
+import event_loop
 import logger_setup
-import gmail_scanner
-import email_parser
-import calendar_manager
-import tasks
 
+# Startup banner, written in one call
+BANNER = (
+    "=" * 60 + "\n"
+    "Gmail Event Scanner & Calendar Integration\n"
+    "Author: Yair Levi\n"
+    + "=" * 60 + "\n"
+    "\n"
+    "Initializing...\n"
+)
 
-def main():
+
+def main(argv=None):
     """Main application entry point."""
+    args = parse_args(argv)
+    
+    # One event loop for the whole run: the async Claude client and its
+    # connection pool are reused by every scan
+    runner = event_loop.Runner()
+    claude_client = None
     try:
-        app_config, gmail_service, claude_client, calendar_service = initialize_app()
+        app_config, gmail_service, claude_client, calendar_service = (
+            initialize_app(runner)
+        )
         
-        mode = prompt_user_mode()
+        mode = select_mode(args, app_config)
+        
+        import tasks
         
         if mode == '1':
             tasks.run_one_time_mode(
-                app_config, gmail_service, claude_client, calendar_service
+                app_config, gmail_service, claude_client, calendar_service,
+                runner
             )
         elif mode == '2':
-            tasks.run_polling_mode(
-                app_config, gmail_service, claude_client, calendar_service
-            )
+            # Pub/Sub push notifications when configured, else interval polling
+            if tasks.push_mode_configured(app_config):
+                tasks.run_push_mode(
+                    app_config, gmail_service, claude_client, calendar_service,
+                    runner
+                )
+            else:
+                tasks.run_polling_mode(
+                    app_config, gmail_service, claude_client, calendar_service,
+                    runner, stop_event=install_stop_handler()
+                )
         else:
             print("Invalid selection. Exiting.")
             sys.exit(1)
@@ -44,26 +76,79 @@ def main():
         sys.exit(0)
     except Exception as e:
         logger = logger_setup.get_logger()
-        logger.critical(f"Fatal error: {e}")
+        logger.critical("Fatal error: %s", e)
         print(f"\nFatal error: {e}")
         print("Check the logs for details.")
         sys.exit(1)
+    finally:
+        if claude_client is not None:
+            runner.run(claude_client.close())
+        runner.close()
+
+
+def install_stop_handler():
+    """
+    Turn SIGTERM (e.g. systemctl stop) into a graceful stop request.
+    
+    Returns:
+        threading.Event that is set when SIGTERM arrives
+    """
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    return stop_event
 
 
-def initialize_app():
+def select_mode(args, app_config):
+    """
+    Decide the execution mode without prompting when possible.
+    
+    Order: --mode, then the GMAIL_SCANNER_MODE environment variable, then
+    system.default_mode from config when stdin is not a terminal (cron,
+    systemd), and only otherwise the interactive prompt.
+    
+    Returns:
+        Mode string ('1' or '2' are valid)
+    """
+    mode = args.mode or os.environ.get('GMAIL_SCANNER_MODE', '').strip()
+    if mode:
+        return mode
+    if not sys.stdin.isatty():
+        return str(app_config.get('system', {}).get('default_mode', '1'))
+    return prompt_user_mode()
+
+
+def parse_args(argv=None):
+    """
+    Parse command line options.
+    
+    Args:
+        argv: Arguments to parse (default: sys.argv[1:])
+    
+    Returns:
+        argparse.Namespace with 'mode' ('1', '2' or None)
+    """
+    parser = argparse.ArgumentParser(
+        description="Gmail Event Scanner & Calendar Integration"
+    )
+    parser.add_argument(
+        '--mode', choices=['1', '2'],
+        help="1 = one-time scan, 2 = continuous scanning "
+             "(default: ask interactively)"
+    )
+    return parser.parse_args(argv)
+
+
+def initialize_app(runner):
     """
     Initialize application components.
     
+    Args:
+        runner: event_loop.Runner the async Claude client will be used on
+    
     Returns:
         Tuple of (config, gmail_service, claude_client, calendar_service)
     """
-    print("=" * 60)
-    print("Gmail Event Scanner & Calendar Integration")
-    print("Author: Yair Levi")
-    print("=" * 60)
-    print()
-    
-    print("Initializing...")
+    sys.stdout.write(BANNER)
     
     app_config = config.load_config()
     log_level = app_config.get('system', {}).get('log_level', 'INFO')
@@ -71,22 +156,92 @@ def initialize_app():
     
     logger.info("Application starting")
     
+    gmail_service, calendar_service, claude_client = runner.run(
+        connect_services()
+    )
+    
+    print("Initialization complete!\n")
+    
+    return app_config, gmail_service, claude_client, calendar_service
+
+
+async def connect_services():
+    """
+    Authenticate and create the API clients, overlapping independent steps.
+    
+    The Google credentials and the Anthropic client are loaded at the same
+    time; the Gmail and Calendar services are built once credentials exist.
+    The blocking calls run in the default thread pool.
+    
+    Returns:
+        Tuple of (gmail_service, calendar_service, claude_client)
+    """
+    import auth_manager
+    import calendar_manager
+    import gmail_scanner
+    
+    loop = asyncio.get_running_loop()
+    
     print("Authenticating with Google APIs...")
-    google_creds = auth_manager.get_google_credentials()
+    creds_task = loop.run_in_executor(None, auth_manager.get_google_credentials)
+    
+    print("Loading Anthropic API key...")
+    claude_task = loop.run_in_executor(None, load_claude_client)
+    
+    google_creds = await creds_task
+    # Create the shared transport before both builders ask for it
+    auth_manager.get_authorized_http(google_creds)
     
     print("Connecting to Gmail...")
-    gmail_service = gmail_scanner.build_gmail_service(google_creds)
+    gmail_task = loop.run_in_executor(
+        None, gmail_scanner.build_gmail_service, google_creds
+    )
     
     print("Connecting to Calendar...")
-    calendar_service = calendar_manager.build_calendar_service(google_creds)
+    calendar_task = loop.run_in_executor(
+        None, calendar_manager.build_calendar_service, google_creds
+    )
     
-    print("Loading Anthropic API key...")
-    api_key = auth_manager.get_anthropic_api_key()
-    claude_client = email_parser.initialize_claude_client(api_key)
+    gmail_service, calendar_service = await asyncio.gather(gmail_task, calendar_task)
     
-    print("Initialization complete!\n")
+    # Open the API connections while the Claude client is still loading
+    warm_up_task = loop.run_in_executor(
+        None, warm_up_connections, gmail_service, calendar_service
+    )
+    claude_client, _ = await asyncio.gather(claude_task, warm_up_task)
     
-    return app_config, gmail_service, claude_client, calendar_service
+    return gmail_service, calendar_service, claude_client
+
+
+def warm_up_connections(gmail_service, calendar_service):
+    """
+    Make one cheap request per API host so the first scan reuses open
+    TLS connections (and an already refreshed access token).
+    
+    Both services share one httplib2 transport, which is not thread-safe,
+    so the two requests run one after the other. Failures are not fatal.
+    """
+    logger = logger_setup.get_logger()
+    try:
+        gmail_service.users().getProfile(userId='me').execute()
+        calendar_service.calendarList().list(maxResults=1).execute()
+        logger.debug("API connections warmed up")
+    except Exception as e:
+        logger.warning("Connection warm-up failed: %s", e)
+
+
+def load_claude_client():
+    """
+    Load the Anthropic API key and create the async Claude client.
+    
+    main() calls this once per run and passes the client to every scan;
+    the API key itself is cached by auth_manager.get_anthropic_api_key().
+    """
+    import auth_manager
+    import email_parser
+    
+    api_key = auth_manager.get_anthropic_api_key()
+    return email_parser.initialize_async_claude_client(api_key)
 
 
 def prompt_user_mode():
@@ -3,8 +3,13 @@ Tasks Module - Orchestrates email scanning, parsing, and calendar event creation
 Author: Yair Levi
 """
 
+import asyncio
+import json
+import queue
+import threading
 import time
 from datetime import datetime, timedelta
+from itertools import islice
 import gmail_scanner
 import email_parser
 import calendar_manager
@@ -13,87 +18,334 @@ import logger_setup
 
 logger = logger_setup.get_logger()
 
-def process_single_email(email_data, claude_client, calendar_service, 
-                         gmail_service, config, mark_read=False):
-    """Process single email: parse and create calendar event."""
-    try:
+# Upper bound on emails parsed by Claude at the same time (rate-limit guard)
+MAX_CONCURRENT_PARSES = 10
+
+# Gmail watches expire after 7 days; renew a day early
+WATCH_RENEW_SECONDS = 6 * 24 * 60 * 60
+
+# Ticks on which a failed email is scanned again before it is dropped
+MAX_MESSAGE_RETRIES = 3
+
+async def parse_email_async(semaphore, async_client, email_data):
+    """Parse one email with the async Claude client, bounded by semaphore."""
+    async with semaphore:
         logger.info(f"Processing email: {email_data['subject']}")
-        meeting_data = email_parser.parse_email_for_meeting(
-            claude_client, email_data['body']
-        )
-        timezone = config['calendar']['timezone']
-        event = calendar_manager.create_event(
-            calendar_service, meeting_data, timezone
+        return await email_parser.parse_email_for_meeting_async(
+            async_client, email_data['body']
         )
+
+async def parse_emails_concurrently(claude_client, emails):
+    """Parse all emails concurrently; failures are returned as exceptions."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_PARSES)
+    return await asyncio.gather(
+        *[parse_email_async(semaphore, claude_client, e) for e in emails],
+        return_exceptions=True
+    )
+
+def process_emails(emails, claude_client, calendar_service,
+                   gmail_service, config, runner, mark_read=False):
+    """
+    Process several emails in three phases: Claude parsing runs
+    concurrently, then all events are de-duplicated and inserted with
+    Calendar batch requests, then the handled emails are marked read
+    with a single batchModify call.
+    
+    The parsing runs on runner's event loop, the loop claude_client
+    (an AsyncAnthropic) and its connection pool belong to.
+    
+    Returns:
+        Tuple of (number of successfully processed emails, IDs of emails
+        that failed for a reason worth retrying)
+    """
+    parsed = runner.run(parse_emails_concurrently(claude_client, emails))
+    
+    timezone = config['calendar']['timezone']
+    ready_emails = []
+    event_bodies = []
+    failed_ids = []
+    for email_data, meeting_data in zip(emails, parsed):
+        if isinstance(meeting_data, Exception):
+            logger.error(f"Failed to process email {email_data['id']}: {meeting_data}")
+            # ValueError: Claude found no valid meeting, which a retry won't change
+            if not isinstance(meeting_data, ValueError):
+                failed_ids.append(email_data['id'])
+            continue
+        try:
+            event_bodies.append(
+                calendar_manager.format_event_for_api(meeting_data, timezone)
+            )
+            ready_emails.append(email_data)
+        except Exception as e:
+            logger.error(f"Failed to process email {email_data['id']}: {e}")
+    
+    events = calendar_manager.create_events_bulk(calendar_service, event_bodies)
+    
+    success_count = 0
+    read_ids = []
+    for email_data, event in zip(ready_emails, events):
+        if isinstance(event, Exception):
+            logger.error(f"Failed to process email {email_data['id']}: {event}")
+            failed_ids.append(email_data['id'])
+            continue
         if event and mark_read:
-            gmail_scanner.mark_as_read(gmail_service, email_data['id'])
-        return True
-    except Exception as e:
-        logger.error(f"Failed to process email {email_data['id']}: {e}")
-        return False
+            read_ids.append(email_data['id'])
+        success_count += 1
+    if read_ids:
+        gmail_scanner.mark_emails_as_read(gmail_service, read_ids)
+    return success_count, failed_ids
 
-def run_one_time_mode(config, gmail_service, claude_client, calendar_service):
+def run_one_time_mode(config, gmail_service, claude_client, calendar_service,
+                      runner):
     """Run in one-time mode: scan once and exit."""
     logger.info("Starting one-time mode")
+    calendar_manager.reset_duplicate_cache()
     query = get_search_query_from_config(config)
     since_date = get_yesterday_date()
-    messages = gmail_scanner.search_emails(gmail_service, query, since_date)
+    max_emails = config['system'].get('max_emails_per_scan', 50)
+    # Only as many result pages as needed for max_emails are fetched
+    messages = gmail_scanner.search_emails(
+        gmail_service, query, since_date, max_results=max_emails
+    )
     
     if not messages:
         logger.info("No matching emails found")
         print("\nNo emails found matching the search criteria.")
         return
     
-    max_emails = config['system'].get('max_emails_per_scan', 50)
-    messages = messages[:max_emails]
     logger.info(f"Processing {len(messages)} emails")
     
-    for msg in messages:
-        email_data = gmail_scanner.get_email_content(gmail_service, msg['id'])
-        process_single_email(
-            email_data, claude_client, calendar_service, 
-            gmail_service, config, mark_read=False
-        )
+    email_ids = [msg['id'] for msg in messages]
+    emails = gmail_scanner.batch_get_email_contents(gmail_service, email_ids)
+    process_emails(
+        emails, claude_client, calendar_service,
+        gmail_service, config, runner, mark_read=False
+    )
     logger.info("One-time mode completed")
     print(f"\nProcessed {len(messages)} emails. Check your calendar!")
 
-def run_polling_mode(config, gmail_service, claude_client, calendar_service):
-    """Run in polling mode: continuous scanning with intervals."""
+def run_polling_mode(config, gmail_service, claude_client, calendar_service,
+                     runner, stop_event=None):
+    """
+    Run in polling mode: continuous scanning with intervals.
+    
+    The wait between scans returns as soon as stop_event is set, so a
+    stop request never waits out the interval.
+    """
+    if stop_event is None:
+        stop_event = threading.Event()
     interval = config['polling']['scan_interval_seconds']
     logger.info(f"Starting polling mode (interval: {interval}s)")
     print(f"\nPolling mode active. Scanning every {interval} seconds.")
     print("Press Ctrl+C to stop.\n")
     
+    history_id = None
+    retry_ids = {}
     try:
         while True:
-            scan_and_process(config, gmail_service, claude_client, 
-                           calendar_service, mark_read=True)
+            history_id, retry_ids = poll_and_process(
+                config, gmail_service, claude_client, calendar_service, runner,
+                history_id, retry_ids
+            )
             logger.info(f"Sleeping for {interval} seconds")
-            time.sleep(interval)
+            if stop_event.wait(interval):
+                logger.info("Polling mode stopped by stop request")
+                print("\n\nPolling stopped. Goodbye!")
+                return
     except KeyboardInterrupt:
         logger.info("Polling mode stopped by user")
         print("\n\nPolling stopped. Goodbye!")
 
+def push_mode_configured(config):
+    """Return True if Pub/Sub push mode is configured and installed."""
+    polling = config['polling']
+    if not (polling.get('pubsub_topic') and polling.get('pubsub_subscription')):
+        return False
+    try:
+        from google.cloud import pubsub_v1  # noqa: F401
+    except ImportError:
+        logger.warning("google-cloud-pubsub not installed, using polling mode")
+        return False
+    return True
+
+def run_push_mode(config, gmail_service, claude_client, calendar_service,
+                  runner):
+    """
+    Run in push mode: Gmail publishes mailbox changes to Pub/Sub and
+    each notification triggers a history-delta scan (no fixed interval).
+    """
+    from google.cloud import pubsub_v1
+    
+    topic = config['polling']['pubsub_topic']
+    subscription = config['polling']['pubsub_subscription']
+    logger.info(f"Starting push mode (subscription: {subscription})")
+    print("\nPush mode active. Waiting for new emails.")
+    print("Press Ctrl+C to stop.\n")
+    
+    # Notifications arrive on subscriber threads; Google service objects
+    # are not thread-safe, so the scanning itself stays on this thread
+    notifications = queue.Queue()
+    
+    def on_notification(message):
+        notifications.put(message.data)
+        message.ack()
+    
+    subscriber = pubsub_v1.SubscriberClient()
+    streaming_pull = subscriber.subscribe(subscription, callback=on_notification)
+    
+    try:
+        gmail_scanner.start_watch(gmail_service, topic)
+        renew_at = time.monotonic() + WATCH_RENEW_SECONDS
+        # Full scan first, for mail that arrived before the watch existed
+        history_id, retry_ids = poll_and_process(
+            config, gmail_service, claude_client, calendar_service, runner
+        )
+        
+        while True:
+            try:
+                data = notifications.get(
+                    timeout=max(0, renew_at - time.monotonic())
+                )
+            except queue.Empty:
+                gmail_scanner.start_watch(gmail_service, topic)
+                renew_at = time.monotonic() + WATCH_RENEW_SECONDS
+                continue
+            
+            # Coalesce a burst of notifications into a single delta scan
+            while not notifications.empty():
+                data = notifications.get_nowait()
+            logger.debug(
+                f"Gmail notification, historyId {json.loads(data).get('historyId')}"
+            )
+            
+            history_id, retry_ids = poll_and_process(
+                config, gmail_service, claude_client, calendar_service, runner,
+                history_id, retry_ids
+            )
+    except KeyboardInterrupt:
+        logger.info("Push mode stopped by user")
+        print("\n\nPush mode stopped. Goodbye!")
+    finally:
+        streaming_pull.cancel()
+        subscriber.close()
+        gmail_scanner.stop_watch(gmail_service)
+
+def poll_and_process(config, gmail_service, claude_client,
+                     calendar_service, runner, history_id=None, retry_ids=None):
+    """
+    Perform one polling tick using Gmail history deltas.
+    
+    The first tick (or one after the history ID expired) runs a full
+    search; later ticks only look at messages added since history_id,
+    plus the emails in retry_ids that failed on earlier ticks.
+    
+    Args:
+        history_id: History ID returned by the previous tick (None: full scan)
+        retry_ids: Dict of failed email ID -> attempts so far, returned by
+            the previous tick
+    
+    Returns:
+        Tuple of (history ID, retry_ids) to pass to the next tick
+    """
+    retry_ids = retry_ids or {}
+    if history_id is None:
+        # Capture the starting point before searching so nothing is missed
+        history_id = gmail_scanner.get_current_history_id(gmail_service)
+        failed_ids = scan_and_process(config, gmail_service, claude_client,
+                                      calendar_service, runner, mark_read=True)
+        return history_id, count_retries(failed_ids, retry_ids)
+    
+    new_ids, new_history_id = gmail_scanner.list_new_message_ids(
+        gmail_service, history_id
+    )
+    if new_ids is None:
+        return poll_and_process(config, gmail_service, claude_client,
+                                calendar_service, runner, retry_ids=retry_ids)
+    
+    candidate_ids = set(new_ids).union(retry_ids)
+    if not candidate_ids:
+        logger.debug("No new emails since last poll")
+        return new_history_id, retry_ids
+    
+    # Search criteria still decide which of the new messages qualify
+    failed_ids = scan_and_process(config, gmail_service, claude_client,
+                                  calendar_service, runner, mark_read=True,
+                                  candidate_ids=candidate_ids)
+    return new_history_id, count_retries(failed_ids, retry_ids)
+
+def count_retries(failed_ids, retry_ids):
+    """
+    Count another attempt for each failed email.
+    
+    Args:
+        failed_ids: IDs of emails that failed on this tick
+        retry_ids: Dict of email ID -> attempts before this tick
+    
+    Returns:
+        Dict of email ID -> attempts for the emails to retry next tick;
+        emails past MAX_MESSAGE_RETRIES are dropped
+    """
+    new_retry_ids = {}
+    for email_id in failed_ids:
+        count = retry_ids.get(email_id, 0) + 1
+        if count > MAX_MESSAGE_RETRIES:
+            logger.warning(f"Giving up on email {email_id} after {count} attempts")
+            continue
+        new_retry_ids[email_id] = count
+    return new_retry_ids
+
 def scan_and_process(config, gmail_service, claude_client, 
-                     calendar_service, mark_read=True):
-    """Perform single scan and process emails."""
+                     calendar_service, runner, mark_read=True, candidate_ids=None):
+    """
+    Perform single scan and process emails.
+    
+    If candidate_ids is given, only matching emails among those IDs
+    are processed. The search is then limited to the time since the
+    oldest candidate arrived, so it does not page through the whole day.
+    
+    Returns:
+        IDs of emails that failed and should be scanned again
+    """
+    calendar_manager.reset_duplicate_cache()
     query = get_search_query_from_config(config)
     since_date = get_yesterday_date()
-    messages = gmail_scanner.search_emails(gmail_service, query, since_date)
+    max_emails = config['system'].get('max_emails_per_scan', 50)
+    failed_ids = []
+    
+    if candidate_ids is None:
+        messages = gmail_scanner.search_emails(
+            gmail_service, query, since_date, max_results=max_emails
+        )
+    else:
+        candidate_ids = list(candidate_ids)
+        dates = gmail_scanner.get_message_dates(gmail_service, candidate_ids)
+        failed_ids.extend(i for i in candidate_ids if i not in dates)
+        if not dates:
+            return failed_ids
+        # Gmail accepts epoch seconds in after:, narrowing the search to the
+        # window the candidates arrived in
+        query = f"{query} after:{min(dates.values()) - 1}"
+        # Filter while paging; stop once max_emails candidates are found
+        matches = (
+            msg for msg in gmail_scanner.iter_emails(gmail_service, query, since_date)
+            if msg['id'] in dates
+        )
+        messages = list(islice(matches, max_emails))
     
     if not messages:
         logger.debug("No new emails found")
-        return
+        return failed_ids
     
-    max_emails = config['system'].get('max_emails_per_scan', 50)
-    messages = messages[:max_emails]
-    
-    for msg in messages:
-        email_data = gmail_scanner.get_email_content(gmail_service, msg['id'])
-        process_single_email(
-            email_data, claude_client, calendar_service,
-            gmail_service, config, mark_read=mark_read
-        )
+    email_ids = [msg['id'] for msg in messages]
+    emails = gmail_scanner.batch_get_email_contents(gmail_service, email_ids)
+    fetched_ids = {email_data['id'] for email_data in emails}
+    failed_ids.extend(i for i in email_ids if i not in fetched_ids)
+    _, process_failed_ids = process_emails(
+        emails, claude_client, calendar_service,
+        gmail_service, config, runner, mark_read=mark_read
+    )
+    failed_ids.extend(process_failed_ids)
+    return failed_ids
 
 def get_search_query_from_config(config):
     """Get search query from config."""
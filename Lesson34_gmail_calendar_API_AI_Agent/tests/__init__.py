@@ -0,0 +1,6 @@
+"""
+Test suite for Gmail Event Scanner.
+Author: Yair Levi
+"""
+
+# Test package initialization
@@ -0,0 +1,170 @@
+"""
+Unit tests for bulk calendar event creation.
+Author: Yair Levi
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import calendar_manager
+
+
+class FakeRequest:
+    """Stand-in for a googleapiclient HttpRequest."""
+    
+    def __init__(self, result):
+        self.result = result
+    
+    def execute(self):
+        return self.result
+
+
+class FakeBatch:
+    """Stand-in for BatchHttpRequest: runs the callback per added request."""
+    
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+    
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+    
+    def execute(self):
+        self.service.batch_sizes.append(len(self.requests))
+        if self.service.batch_error is not None:
+            raise self.service.batch_error
+        for request_id, request in self.requests:
+            body = request.result
+            if body['summary'] in self.service.failing_summaries:
+                self.callback(request_id, None, RuntimeError("insert rejected"))
+            else:
+                self.service.created.append(body['summary'])
+                self.callback(request_id, {'htmlLink': body['summary']}, None)
+
+
+class FakeEvents:
+    """Stand-in for service.events()."""
+    
+    def __init__(self, service):
+        self.service = service
+    
+    def list(self, **kwargs):
+        items = [{'summary': summary} for summary in self.service.existing]
+        return FakeRequest({'items': items})
+    
+    def insert(self, calendarId, body):
+        return FakeRequest(body)
+
+
+class FakeCalendarService:
+    """Calendar API fake recording inserted events and batch sizes."""
+    
+    def __init__(self, existing=(), failing_summaries=(), batch_error=None):
+        self.existing = set(existing)
+        self.failing_summaries = set(failing_summaries)
+        self.batch_error = batch_error
+        self.created = []
+        self.batch_sizes = []
+    
+    def events(self):
+        return FakeEvents(self)
+    
+    def new_batch_http_request(self, callback):
+        return FakeBatch(self, callback)
+
+
+def make_event(summary, hour=10):
+    """Build an event body as format_event_for_api does."""
+    meeting = {
+        'date': '2026-03-01',
+        'start_time': f'{hour:02d}:00',
+        'end_time': f'{hour + 1:02d}:00',
+        'subject': summary,
+    }
+    return calendar_manager.format_event_for_api(meeting, 'Asia/Jerusalem')
+
+
+@pytest.fixture(autouse=True)
+def clear_duplicate_cache():
+    """Start every test with an empty duplicate cache."""
+    calendar_manager.reset_duplicate_cache()
+    yield
+    calendar_manager.reset_duplicate_cache()
+
+
+class TestCreateEventsBulk:
+    """Test create_events_bulk."""
+    
+    def test_creates_events_in_order(self):
+        """Test that results line up with the event bodies."""
+        service = FakeCalendarService()
+        events = [make_event('Standup', 9), make_event('Review', 14)]
+        
+        results = calendar_manager.create_events_bulk(service, events)
+        
+        assert [r['htmlLink'] for r in results] == ['Standup', 'Review']
+        assert service.created == ['Standup', 'Review']
+    
+    def test_skips_existing_and_repeated_events(self):
+        """Test duplicates already in the calendar and within the call."""
+        service = FakeCalendarService(existing=['Standup'])
+        events = [make_event('Standup'), make_event('Review'), make_event('Review')]
+        
+        results = calendar_manager.create_events_bulk(service, events)
+        
+        assert results[0] is None
+        assert results[1]['htmlLink'] == 'Review'
+        assert results[2] is None
+        assert service.created == ['Review']
+    
+    def test_created_event_is_seen_by_later_calls(self):
+        """Test that a created event is a duplicate for the rest of the scan."""
+        service = FakeCalendarService()
+        calendar_manager.create_events_bulk(service, [make_event('Review')])
+        
+        results = calendar_manager.create_events_bulk(service, [make_event('Review')])
+        
+        assert results == [None]
+        assert service.created == ['Review']
+    
+    def test_failed_insert_is_reported_and_not_cached(self):
+        """Test that a rejected insert returns its error and can be retried."""
+        service = FakeCalendarService(failing_summaries=['Review'])
+        
+        results = calendar_manager.create_events_bulk(service, [make_event('Review')])
+        assert isinstance(results[0], RuntimeError)
+        
+        service.failing_summaries.clear()
+        results = calendar_manager.create_events_bulk(service, [make_event('Review')])
+        assert results[0]['htmlLink'] == 'Review'
+    
+    def test_batch_failure_marks_every_event(self):
+        """Test that a failed batch round trip does not raise."""
+        error = OSError("connection reset")
+        service = FakeCalendarService(batch_error=error)
+        events = [make_event('Standup', 9), make_event('Review', 14)]
+        
+        results = calendar_manager.create_events_bulk(service, events)
+        
+        assert results == [error, error]
+        
+        service.batch_error = None
+        results = calendar_manager.create_events_bulk(service, events)
+        assert service.created == ['Standup', 'Review']
+    
+    def test_splits_into_calendar_batches(self):
+        """Test that at most CALENDAR_BATCH_SIZE inserts share a request."""
+        service = FakeCalendarService()
+        events = [
+            make_event(f'Meeting {i}')
+            for i in range(calendar_manager.CALENDAR_BATCH_SIZE + 1)
+        ]
+        
+        calendar_manager.create_events_bulk(service, events)
+        
+        assert service.batch_sizes == [calendar_manager.CALENDAR_BATCH_SIZE, 1]
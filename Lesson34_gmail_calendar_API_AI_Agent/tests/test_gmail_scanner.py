@@ -0,0 +1,83 @@
+"""
+Unit tests for Gmail message body extraction.
+Author: Yair Levi
+"""
+
+import base64
+from pathlib import Path
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import gmail_scanner
+
+
+def encode(text):
+    """Encode text the way Gmail returns body data (URL-safe base64)."""
+    return base64.urlsafe_b64encode(text.encode('utf-8')).decode('ascii')
+
+
+class TestCleanHtml:
+    """Test HTML to text conversion."""
+    
+    def test_removes_tags_and_collapses_whitespace(self):
+        """Test that tags are removed and whitespace is collapsed."""
+        html = "<html><body><p>Team   meeting</p>\n<p>at <b>10:00</b></p></body></html>"
+        assert gmail_scanner.clean_html(html) == "Team meeting at 10:00"
+    
+    def test_keeps_table_cells_apart(self):
+        """Test that adjacent cells do not merge into one word."""
+        html = "<table><tr><td>Date</td><td>Monday</td></tr></table>"
+        assert gmail_scanner.clean_html(html) == "Date Monday"
+    
+    def test_drops_style_and_script(self):
+        """Test that CSS and JavaScript are not part of the text."""
+        html = (
+            "<html><head><style>p { color: red; }</style>"
+            "<script>var tracking = 1;</script></head>"
+            "<body><p>Hello</p><script>alert(1)</script>world</body></html>"
+        )
+        assert gmail_scanner.clean_html(html) == "Hello world"
+    
+    def test_accepts_xml_declaration(self):
+        """Test a body that starts with an XML encoding declaration."""
+        html = (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            "<html><body><p>Meeting on Sunday</p></body></html>"
+        )
+        assert gmail_scanner.clean_html(html) == "Meeting on Sunday"
+    
+    def test_empty_document(self):
+        """Test empty and whitespace-only bodies."""
+        assert gmail_scanner.clean_html("") == ""
+        assert gmail_scanner.clean_html("   \n ") == ""
+
+
+class TestExtractEmailBody:
+    """Test body extraction from message payloads."""
+    
+    def test_prefers_plain_text_part(self):
+        """Test that the text/plain part wins over text/html."""
+        payload = {'parts': [
+            {'mimeType': 'text/html', 'body': {'data': encode("<p>html</p>")}},
+            {'mimeType': 'text/plain', 'body': {'data': encode("plain")}},
+        ]}
+        assert gmail_scanner.extract_email_body(payload) == "plain"
+    
+    def test_html_part(self):
+        """Test that an HTML-only message is converted to text."""
+        payload = {'parts': [
+            {'mimeType': 'text/html', 'body': {'data': encode("<p>Hi <i>there</i></p>")}},
+        ]}
+        assert gmail_scanner.extract_email_body(payload) == "Hi there"
+    
+    def test_parts_without_body(self):
+        """Test parts that the partial response returns without a body."""
+        payload = {'parts': [{'mimeType': 'text/plain'}, {}]}
+        assert gmail_scanner.extract_email_body(payload) == ""
+    
+    def test_single_part_message(self):
+        """Test a message without parts, with and without body data."""
+        assert gmail_scanner.extract_email_body({'body': {'data': encode("hi")}}) == "hi"
+        assert gmail_scanner.extract_email_body({'mimeType': 'text/plain'}) == ""
@@ -17,6 +17,13 @@ from .tasks import (
 
 logger = get_logger()
 
+SEPARATOR = "=" * 70
+
+
+def task_banner(title: str) -> str:
+    """Build a task banner (title between separator lines) as one message."""
+    return f"{SEPARATOR}\n{title}\n{SEPARATOR}"
+
 
 def run_task_1(input_path: Path) -> bool:
     """
@@ -28,9 +35,7 @@ def run_task_1(input_path: Path) -> bool:
     Returns:
         bool: True if successful
     """
-    logger.info("=" * 70)
-    logger.info("TASK 1: VIDEO METADATA ANALYSIS")
-    logger.info("=" * 70)
+    logger.info(task_banner("TASK 1: VIDEO METADATA ANALYSIS"))
     
     try:
         analyze_video_metadata(input_path)
@@ -50,9 +55,7 @@ def run_task_2(input_path: Path) -> bool:
     Returns:
         bool: True if successful
     """
-    logger.info("=" * 70)
-    logger.info("TASK 2: MOTION VECTOR VISUALIZATION")
-    logger.info("=" * 70)
+    logger.info(task_banner("TASK 2: MOTION VECTOR VISUALIZATION"))
     
     try:
         extract_and_analyze_motion_vectors(input_path)
@@ -77,9 +80,7 @@ def run_task_3(input_path: Path, output_path: Path, width: int, height: int, fps
     Returns:
         bool: True if successful
     """
-    logger.info("=" * 70)
-    logger.info("TASK 3: OVERLAY MOVING OBJECT ON VIDEO")
-    logger.info("=" * 70)
+    logger.info(task_banner("TASK 3: OVERLAY MOVING OBJECT ON VIDEO"))
     
     try:
         generate_test_video(input_path, output_path)
@@ -10,11 +10,10 @@ Date: February 1, 2026
 
 import argparse
 import sys
+from functools import lru_cache
 from pathlib import Path
 
 from .utils.logger import setup_logger
-from .utils.ffmpeg_wrapper import check_ffmpeg_installed
-from .cli_handlers import run_task_1, run_task_2, run_task_3
 from . import __version__, __author__
 from .config import PROJECT_ROOT
 
@@ -52,10 +51,19 @@ v{__version__}  Author: {__author__}
     return parser
 
 
+@lru_cache(maxsize=1)
+def get_argument_parser():
+    """Return the argument parser, built once and reused across calls."""
+    return create_argument_parser()
+
+
 def main():
     """Main entry point for the application."""
-    parser = create_argument_parser()
-    args = parser.parse_args()
+    args = get_argument_parser().parse_args()
+    
+    # Deferred so --help/--version do not import the task modules
+    from .utils.ffmpeg_wrapper import check_ffmpeg_installed
+    from .cli_handlers import run_task_1, run_task_2, run_task_3
     
     logger.info(f"Video Processing Analysis Tool v{__version__}")
     logger.info(f"Author: {__author__}")
@@ -101,38 +109,33 @@ def main():
             output_path = PROJECT_ROOT / output_path
         output_path = output_path.resolve()
     
+    # Task number -> (runner, hint shown when --input is missing)
+    task_table = {
+        1: (lambda: run_task_1(input_path), "--input argument"),
+        2: (lambda: run_task_2(input_path), "--input argument"),
+        3: (lambda: run_task_3(input_path, output_path, args.width, args.height,
+                               args.fps, args.duration),
+            "--input (source video to overlay)"),
+    }
+    
+    # Every task reads the input video, so check it once for all of them
+    input_exists = input_path is not None and input_path.exists()
+    
     for task_num in tasks_to_run:
-        if task_num in [1, 2]:
-            if not input_path:
-                logger.error(f"Task {task_num} requires --input argument")
-                print(f"Error: Task {task_num} requires --input argument")
-                continue
-            
-            if not input_path.exists():
-                logger.error(f"Input file not found: {input_path}")
-                print(f"Error: Input file not found: {input_path}")
-                continue
-            
-            if task_num == 1:
-                if run_task_1(input_path):
-                    success_count += 1
-            elif task_num == 2:
-                if run_task_2(input_path):
-                    success_count += 1
+        runner, input_hint = task_table[task_num]
+        
+        if not input_path:
+            logger.error(f"Task {task_num} requires --input argument")
+            print(f"Error: Task {task_num} requires {input_hint}")
+            continue
+        
+        if not input_exists:
+            logger.error(f"Input file not found: {input_path}")
+            print(f"Error: Input file not found: {input_path}")
+            continue
         
-        elif task_num == 3:
-            # Task 3 needs the input video (extracts its frames, overlays object)
-            if not input_path:
-                logger.error("Task 3 requires --input argument")
-                print("Error: Task 3 requires --input (source video to overlay)")
-                continue
-            if not input_path.exists():
-                logger.error(f"Input file not found: {input_path}")
-                print(f"Error: Input file not found: {input_path}")
-                continue
-            
-            if run_task_3(input_path, output_path, args.width, args.height, args.fps, args.duration):
-                success_count += 1
+        if runner():
+            success_count += 1
     
     # Summary
     total_tasks = len(tasks_to_run)
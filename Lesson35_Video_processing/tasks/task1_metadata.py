@@ -7,14 +7,14 @@ container format, streams, GOP structure, and frame information.
 Author: Yair Levi
 """
 
+from collections import Counter
 from pathlib import Path
 from typing import Dict, List
 
 from ..utils.logger import get_logger
 from ..utils.ffmpeg_wrapper import (
     check_ffmpeg_installed,
-    get_video_metadata,
-    get_frame_data
+    get_video_metadata_and_frames
 )
 from ..utils.metadata_helpers import print_metadata_report
 
@@ -31,12 +31,11 @@ def analyze_gop_structure(frames: List[Dict]) -> Dict:
     Returns:
         dict: GOP statistics including frame counts and percentages
     """
-    i_frames = [f for f in frames if f.get('pict_type') == 'I']
-    p_frames = [f for f in frames if f.get('pict_type') == 'P']
-    b_frames = [f for f in frames if f.get('pict_type') == 'B']
+    counts = Counter(f.get('pict_type') for f in frames)
+    i_frames, p_frames, b_frames = counts['I'], counts['P'], counts['B']
     
     total_frames = len(frames)
-    gop_count = len(i_frames)
+    gop_count = i_frames
     
     if gop_count == 0:
         avg_gop_size = 0
@@ -45,12 +44,12 @@ def analyze_gop_structure(frames: List[Dict]) -> Dict:
     
     return {
         'total_frames': total_frames,
-        'i_frames': len(i_frames),
-        'p_frames': len(p_frames),
-        'b_frames': len(b_frames),
-        'i_percentage': (len(i_frames) / total_frames * 100) if total_frames > 0 else 0,
-        'p_percentage': (len(p_frames) / total_frames * 100) if total_frames > 0 else 0,
-        'b_percentage': (len(b_frames) / total_frames * 100) if total_frames > 0 else 0,
+        'i_frames': i_frames,
+        'p_frames': p_frames,
+        'b_frames': b_frames,
+        'i_percentage': (i_frames / total_frames * 100) if total_frames > 0 else 0,
+        'p_percentage': (p_frames / total_frames * 100) if total_frames > 0 else 0,
+        'b_percentage': (b_frames / total_frames * 100) if total_frames > 0 else 0,
         'gop_count': gop_count,
         'avg_gop_size': avg_gop_size
     }
@@ -75,12 +74,8 @@ def analyze_video_metadata(video_path: Path) -> Dict:
     if not video_path.exists():
         raise FileNotFoundError(f"Video file not found: {video_path}")
     
-    # Get metadata
-    metadata = get_video_metadata(video_path)
-    
-    # Get frame data for GOP analysis
-    frame_data = get_frame_data(video_path)
-    frames = frame_data.get('frames', [])
+    # Get metadata and frame data for GOP analysis in one FFprobe run
+    metadata, frames = get_video_metadata_and_frames(video_path)
     
     # Analyze GOP structure
     gop_stats = analyze_gop_structure(frames)
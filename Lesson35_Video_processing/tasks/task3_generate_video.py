@@ -8,26 +8,52 @@ into a new video.
 Author: Yair Levi
 """
 
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Optional, Dict, Iterable, Tuple
+import os
 import shutil
 import time
 
-from PIL import Image, ImageDraw
+from PIL import Image
+
+# OpenCV is optional; its imread/imwrite are faster than PIL's
+try:
+    import cv2
+except ImportError:
+    cv2 = None
 
 from ..utils.logger import get_logger
-from ..utils.ffmpeg_wrapper import run_ffmpeg, run_ffprobe
+from ..utils.ffmpeg_wrapper import (
+    run_ffmpeg,
+    run_ffprobe,
+    read_raw_frames,
+    encode_raw_frames,
+)
+from ..utils.video_generation_helpers import (
+    calculate_diagonal_positions,
+    paint_rectangles,
+)
 from ..config import (
     PROJECT_ROOT,
     DEFAULT_OBJECT_WIDTH,
     DEFAULT_OBJECT_HEIGHT,
     DEFAULT_OBJECT_COLOR,
+    OVERLAY_METHOD,
+    OVERLAY_FRAME_FORMAT,
+    OVERLAY_PNG_COMPRESS_LEVEL,
+    X264_PRESET,
+    X264_CRF,
+    USE_MULTIPROCESSING,
+    MAX_WORKERS,
+    FRAME_BATCH_SIZE,
 )
 
 logger = get_logger()
 
 # Temporary directory for extracted / modified frames
 TEMP_DIR = PROJECT_ROOT / "temp_frames_task3"
+TEMP_FRAME_PATTERN = f"frame_%04d.{OVERLAY_FRAME_FORMAT}"
 
 
 def get_video_info(video_path: Path) -> Dict:
@@ -41,47 +67,148 @@ def get_video_info(video_path: Path) -> Dict:
     num, den = vs.get("r_frame_rate", "30/1").split("/")
     fps = float(num) / float(den) if int(den) else 30.0
     duration = float(meta.get("format", {}).get("duration", 0))
+    # Prefer the container's exact frame count over the duration estimate
+    if str(vs.get("nb_frames", "")).isdigit():
+        frame_count = int(vs["nb_frames"])
+    else:
+        frame_count = int(duration * fps) if duration else 300
     return {"width": width, "height": height, "fps": fps,
-            "frame_count": int(duration * fps) if duration else 300}
+            "frame_count": frame_count}
 
 
 def extract_raw_frames(video_path: Path, out_dir: Path) -> int:
-    """Extract all frames from the video as PNG files."""
+    """Extract all frames from the video as OVERLAY_FRAME_FORMAT images."""
     out_dir.mkdir(exist_ok=True)
-    pattern = str(out_dir / "frame_%04d.png")
-    run_ffmpeg(["-i", str(video_path), "-y", pattern])
-    count = len(list(out_dir.glob("frame_*.png")))
+    pattern = str(out_dir / TEMP_FRAME_PATTERN)
+    args = ["-i", str(video_path), "-y"]
+    if OVERLAY_FRAME_FORMAT == "png":
+        args += ["-compression_level", str(OVERLAY_PNG_COMPRESS_LEVEL)]
+    run_ffmpeg(args + [pattern])
+    suffix = f".{OVERLAY_FRAME_FORMAT}"
+    # One directory read, no list and no fnmatch per entry
+    with os.scandir(out_dir) as entries:
+        count = sum(1 for e in entries
+                    if e.name.startswith("frame_") and e.name.endswith(suffix))
     logger.info(f"Extracted {count} raw frames")
     return count
 
 
+def overlay_single_frame(task: Tuple[Path, int, int]) -> bool:
+    """
+    Draw the object on one frame file (module-level so it can be pickled).
+    
+    Args:
+        task: Tuple of (frame_path, x, y)
+    
+    Returns:
+        bool: True if the frame existed and was updated
+    """
+    frame_path, x, y = task
+    if not frame_path.exists():
+        return False
+    if cv2 is not None:
+        img = cv2.imread(str(frame_path))
+        if img is None:
+            return False
+        # The image is a numpy array: fill the box with a slice store (BGR order)
+        img[y:y + DEFAULT_OBJECT_HEIGHT, x:x + DEFAULT_OBJECT_WIDTH] = \
+            DEFAULT_OBJECT_COLOR[::-1]
+        # PNG compression level is ignored for other formats
+        cv2.imwrite(str(frame_path), img,
+                    [cv2.IMWRITE_PNG_COMPRESSION, OVERLAY_PNG_COMPRESS_LEVEL])
+        return True
+    img = Image.open(frame_path)
+    # Filling a box with paste is a plain row copy, unlike ImageDraw's rasterizer
+    img.paste(DEFAULT_OBJECT_COLOR,
+              (x, y, x + DEFAULT_OBJECT_WIDTH, y + DEFAULT_OBJECT_HEIGHT))
+    img.save(frame_path, compress_level=OVERLAY_PNG_COMPRESS_LEVEL, optimize=False)
+    return True
+
+
 def overlay_moving_object(out_dir: Path, frame_count: int, width: int, height: int):
     """Draw moving rectangle on each extracted frame (overwrites in place)."""
-    obj_w, obj_h = DEFAULT_OBJECT_WIDTH, DEFAULT_OBJECT_HEIGHT
-    for i in range(frame_count):
-        frame_path = out_dir / f"frame_{i + 1:04d}.png"
-        if not frame_path.exists():
-            continue
-        progress = i / (frame_count - 1) if frame_count > 1 else 0
-        x = int(progress * (width - obj_w))
-        y = int(progress * (height - obj_h))
-        img = Image.open(frame_path)
-        ImageDraw.Draw(img).rectangle([x, y, x + obj_w, y + obj_h], fill=DEFAULT_OBJECT_COLOR)
-        img.save(frame_path)
-        if (i + 1) % 100 == 0:
-            logger.info(f"Overlaid object on {i + 1}/{frame_count} frames")
+    # The whole trajectory is fixed by the frame count and sizes: compute it once
+    xs, ys = calculate_diagonal_positions(
+        frame_count, width, height, DEFAULT_OBJECT_WIDTH, DEFAULT_OBJECT_HEIGHT
+    )
+    tasks = [
+        (out_dir / (TEMP_FRAME_PATTERN % (i + 1)), x, y)
+        for i, (x, y) in enumerate(zip(xs.tolist(), ys.tolist()))
+    ]
+
+    # Frames are independent: spread the decode/draw/encode over all cores
+    if USE_MULTIPROCESSING and frame_count >= FRAME_BATCH_SIZE:
+        logger.info("Overlaying %d frames using %d workers", frame_count, MAX_WORKERS)
+        with ProcessPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            log_overlay_progress(
+                pool.map(overlay_single_frame, tasks, chunksize=16), frame_count
+            )
+    else:
+        log_overlay_progress(map(overlay_single_frame, tasks), frame_count)
     logger.info("Moving object overlay complete")
 
 
+def log_overlay_progress(results: Iterable[bool], frame_count: int) -> None:
+    """Drain the per-frame results, logging progress every 100 frames."""
+    # %-style arguments: the message is only built if a handler emits it
+    for done, _ in enumerate(results, 1):
+        if done % 100 == 0:
+            logger.info("Overlaid object on %d/%d frames", done, frame_count)
+
+
+def build_overlay_filter(frame_count: int) -> str:
+    """
+    Build the FFmpeg filter graph that draws the moving object.
+    
+    A solid-color source the size of the object is overlaid on the video;
+    the overlay position is re-evaluated per frame, following the same
+    diagonal path as overlay_moving_object. (drawbox cannot do this: its
+    position expressions have no frame number.)
+    
+    Args:
+        frame_count: Number of frames in the source video
+    
+    Returns:
+        str: filter_complex graph with the result on the [v] pad
+    """
+    last = max(frame_count - 1, 1)
+    color = "0x{:02X}{:02X}{:02X}".format(*DEFAULT_OBJECT_COLOR)
+    # overlay's n is 1 for the first frame, hence n-1
+    return (
+        f"color=c={color}:s={DEFAULT_OBJECT_WIDTH}x{DEFAULT_OBJECT_HEIGHT}[box];"
+        f"[0:v][box]overlay="
+        f"x='trunc((W-w)*(n-1)/{last})':"
+        f"y='trunc((H-h)*(n-1)/{last})':"
+        f"shortest=1[v]"
+    )
+
+
+def overlay_video_single_pass(input_path: Path, output_path: Path, frame_count: int):
+    """Decode, draw the moving object and encode with one FFmpeg run."""
+    run_ffmpeg([
+        "-i", str(input_path),
+        "-filter_complex", build_overlay_filter(frame_count),
+        "-map", "[v]",
+        "-c:v", "libx264",
+        "-preset", X264_PRESET,
+        "-pix_fmt", "yuv420p",
+        "-crf", str(X264_CRF),
+        "-y",
+        str(output_path)
+    ])
+    logger.info(f"Encoded output video: {output_path}")
+
+
 def encode_frames_to_video(frames_dir: Path, output_path: Path, fps: float):
     """Encode modified frames back to video with H.264."""
-    pattern = str(frames_dir / "frame_%04d.png")
+    pattern = str(frames_dir / TEMP_FRAME_PATTERN)
     run_ffmpeg([
         "-framerate", str(fps),
         "-i", pattern,
         "-c:v", "libx264",
+        "-preset", X264_PRESET,
         "-pix_fmt", "yuv420p",
-        "-crf", "23",
+        "-crf", str(X264_CRF),
         "-y",
         str(output_path)
     ])
@@ -112,6 +239,49 @@ def generate_test_video(
     info = get_video_info(input_path)
     logger.info(f"Source: {info['width']}x{info['height']} @ {info['fps']} fps")
 
+    if OVERLAY_METHOD == "ffmpeg":
+        # Everything stays inside FFmpeg: no temp PNGs, no Python per frame
+        overlay_video_single_pass(input_path, output_path, info["frame_count"])
+        actual_count = info["frame_count"]
+    elif OVERLAY_METHOD == "numpy":
+        actual_count = overlay_via_numpy(input_path, output_path, info)
+    else:
+        actual_count = overlay_via_frames(input_path, output_path, info)
+
+    elapsed = time.time() - start
+    size_kb = output_path.stat().st_size / 1024
+
+    sep = "=" * 60
+    print(f"\n{sep}\n  TASK 3 — MOVING OBJECT OVERLAY REPORT\n{sep}")
+    print(f"  Input   : {input_path}")
+    print(f"  Output  : {output_path}  ({size_kb:.1f} KB)")
+    print(f"  Frames  : {actual_count}  @ {info['width']}x{info['height']}")
+    print(f"  Object  : {DEFAULT_OBJECT_WIDTH}x{DEFAULT_OBJECT_HEIGHT} px black, diagonal TL->BR")
+    print(f"  Time    : {elapsed:.2f} s\n{sep}\n")
+
+    logger.info(f"Task 3 complete in {elapsed:.2f}s -> {output_path}")
+    return {"output": str(output_path), "frames": actual_count, "time": elapsed}
+
+
+def overlay_via_numpy(input_path: Path, output_path: Path, info: Dict) -> int:
+    """In-memory pipeline: raw frames to numpy, vectorized paint, raw frames back."""
+    frames = read_raw_frames(
+        input_path, info["width"], info["height"], info["frame_count"]
+    )
+    xs, ys = calculate_diagonal_positions(
+        len(frames), info["width"], info["height"],
+        DEFAULT_OBJECT_WIDTH, DEFAULT_OBJECT_HEIGHT
+    )
+    paint_rectangles(frames, xs, ys, DEFAULT_OBJECT_WIDTH,
+                     DEFAULT_OBJECT_HEIGHT, DEFAULT_OBJECT_COLOR)
+    logger.info("Moving object overlay complete")
+    encode_raw_frames(frames, output_path, info["fps"])
+    logger.info(f"Encoded output video: {output_path}")
+    return len(frames)
+
+
+def overlay_via_frames(input_path: Path, output_path: Path, info: Dict) -> int:
+    """Frame-by-frame pipeline: extract, draw in Python, re-encode."""
     # Prepare temp dir (clean previous run)
     if TEMP_DIR.exists():
         shutil.rmtree(TEMP_DIR)
@@ -121,20 +291,7 @@ def generate_test_video(
         actual_count = extract_raw_frames(input_path, TEMP_DIR)
         overlay_moving_object(TEMP_DIR, actual_count, info["width"], info["height"])
         encode_frames_to_video(TEMP_DIR, output_path, info["fps"])
-
-        elapsed = time.time() - start
-        size_kb = output_path.stat().st_size / 1024
-
-        sep = "=" * 60
-        print(f"\n{sep}\n  TASK 3 — MOVING OBJECT OVERLAY REPORT\n{sep}")
-        print(f"  Input   : {input_path}")
-        print(f"  Output  : {output_path}  ({size_kb:.1f} KB)")
-        print(f"  Frames  : {actual_count}  @ {info['width']}x{info['height']}")
-        print(f"  Object  : {DEFAULT_OBJECT_WIDTH}x{DEFAULT_OBJECT_HEIGHT} px black, diagonal TL->BR")
-        print(f"  Time    : {elapsed:.2f} s\n{sep}\n")
-
-        logger.info(f"Task 3 complete in {elapsed:.2f}s -> {output_path}")
-        return {"output": str(output_path), "frames": actual_count, "time": elapsed}
+        return actual_count
 
     finally:
         if TEMP_DIR.exists():
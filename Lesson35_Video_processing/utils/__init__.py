@@ -13,7 +13,8 @@ from .ffmpeg_wrapper import (
     run_ffmpeg,
     extract_frames_with_motion_vectors,
     get_video_metadata,
-    get_frame_data
+    get_frame_data,
+    get_video_metadata_and_frames
 )
 
 __all__ = [
@@ -24,5 +25,6 @@ __all__ = [
     'run_ffmpeg',
     'extract_frames_with_motion_vectors',
     'get_video_metadata',
-    'get_frame_data'
+    'get_frame_data',
+    'get_video_metadata_and_frames'
 ]
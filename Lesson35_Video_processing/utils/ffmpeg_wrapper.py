@@ -4,10 +4,13 @@ Author: Yair Levi
 """
 
 import json
+import logging
+import os
 import subprocess
+from functools import lru_cache
 import shutil
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 
 from .logger import get_logger
 from ..config import (
@@ -17,9 +20,17 @@ from ..config import (
     FFMPEG_OVERWRITE_ARGS,
     MOTION_VECTOR_FILTER,
     FRAME_FILENAME_PATTERN,
-    FRAMES_DIR
+    FRAMES_DIR,
+    X264_PRESET,
+    X264_CRF
 )
 
+# orjson is optional; it parses large ffprobe outputs several times faster
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 logger = get_logger()
 
 
@@ -43,40 +54,63 @@ def check_ffmpeg_installed() -> bool:
 
 
 def run_ffprobe(video_path: Path, args: List[str]) -> Dict[str, Any]:
-    """Execute FFprobe command and return parsed JSON output."""
-    cmd = [FFPROBE_BINARY] + args + [str(video_path)]
+    """
+    Execute FFprobe command and return parsed JSON output.
+    
+    Results are cached per (file, args) and invalidated when the file's
+    modification time or size changes, so repeated probes of the same
+    video do not spawn new processes. Treat the result as read-only.
+    """
+    stat = os.stat(video_path)
+    return probe_cached(str(video_path), tuple(args), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=64)
+def probe_cached(video_path: str, args: Tuple[str, ...],
+                 mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Run FFprobe (cached by run_ffprobe; mtime_ns/size are cache keys only)."""
+    cmd = [FFPROBE_BINARY] + list(args) + [video_path]
     
     logger.debug(f"Running FFprobe: {' '.join(cmd)}")
     
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        output = result.stdout
-        return json.loads(output)
+        # Keep stdout as bytes: both parsers accept them, saving a decode
+        result = subprocess.run(cmd, capture_output=True, check=True)
+        return json_loads(result.stdout)
     
     except subprocess.CalledProcessError as e:
-        logger.error(f"FFprobe failed: {e.stderr}")
+        logger.error(f"FFprobe failed: {e.stderr.decode(errors='replace')}")
         raise
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError
     except json.JSONDecodeError as e:
         logger.error(f"Failed to parse FFprobe JSON output: {e}")
         raise
 
 
 def run_ffmpeg(args: List[str]) -> bool:
-    """Execute FFmpeg command."""
-    cmd = [FFMPEG_BINARY] + args
+    """
+    Execute FFmpeg command.
+    
+    FFmpeg writes nothing useful to stdout, so it is discarded; the
+    per-frame progress lines are switched off with -nostats. stderr is
+    kept as bytes and only decoded for a failure or a debug log.
+    """
+    cmd = [FFMPEG_BINARY, "-nostats"] + args
     
     logger.debug(f"Running FFmpeg: {' '.join(cmd)}")
     
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        result = subprocess.run(
+            cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True
+        )
         
-        if result.stderr:
-            logger.debug(f"FFmpeg stderr: {result.stderr}")
+        if result.stderr and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"FFmpeg stderr: {result.stderr.decode(errors='replace')}")
         
         return True
     
     except subprocess.CalledProcessError as e:
-        logger.error(f"FFmpeg failed: {e.stderr}")
+        logger.error(f"FFmpeg failed: {e.stderr.decode(errors='replace')}")
         raise
 
 
@@ -107,6 +141,44 @@ def get_frame_data(video_path: Path) -> Dict[str, Any]:
     return frame_data
 
 
+def get_video_metadata_and_frames(video_path: Path) -> Tuple[Dict[str, Any], List[Dict]]:
+    """
+    Extract metadata and frame-level data with a single FFprobe run.
+    
+    Equivalent to get_video_metadata() + get_frame_data() but spawns one
+    process instead of two.
+    
+    Returns:
+        Tuple of (metadata with 'format'/'streams', frames of the first video stream)
+    """
+    args = [
+        "-v", "error",
+        "-show_format", "-show_streams",
+        "-show_entries", "frame=stream_index,pict_type,pts_time",
+        "-of", "json"
+    ]
+    
+    logger.info(f"Extracting metadata and frame data from: {video_path}")
+    probe = run_ffprobe(video_path, args)
+    
+    # Streams are not filtered (metadata lists them all), so keep only the
+    # frames of the first video stream, as "-select_streams v:0" would
+    streams = probe.get('streams', [])
+    video_index = next(
+        (s.get('index') for s in streams if s.get('codec_type') == 'video'),
+        None
+    )
+    frames = [
+        f for f in probe.get('frames', [])
+        if f.get('stream_index') == video_index
+    ]
+    # Build a new dict: the probe result is cached and must not be modified
+    metadata = {key: value for key, value in probe.items() if key != 'frames'}
+    
+    logger.info(f"Extracted metadata and data for {len(frames)} frames")
+    return metadata, frames
+
+
 def extract_frames_with_motion_vectors(
     video_path: Path,
     output_dir: Optional[Path] = None
@@ -135,7 +207,82 @@ def extract_frames_with_motion_vectors(
     run_ffmpeg(args)
     
     # Count extracted frames
-    frame_count = len(list(output_dir.glob("*.png")))
+    with os.scandir(output_dir) as entries:
+        frame_count = sum(1 for e in entries if e.name.endswith(".png"))
     logger.info(f"Extracted {frame_count} frames")
     
     return frame_count
+
+
+def read_raw_frames(video_path: Path, width: int, height: int, frame_count: int):
+    """
+    Decode a whole video into one contiguous RGB frame stack.
+    
+    FFmpeg writes raw rgb24 frames to a pipe, which are read straight into
+    a preallocated numpy array (no temp files, no per-frame images).
+    
+    Args:
+        video_path: Source video
+        width: Frame width in pixels
+        height: Frame height in pixels
+        frame_count: Expected number of frames (the buffer grows if exceeded)
+    
+    Returns:
+        numpy.ndarray: uint8 array of shape (frames, height, width, 3)
+    """
+    import numpy as np
+    
+    cmd = [FFMPEG_BINARY] + FFMPEG_QUIET_ARGS + [
+        "-i", str(video_path),
+        "-f", "rawvideo", "-pix_fmt", "rgb24", "-"
+    ]
+    logger.debug(f"Running FFmpeg: {' '.join(cmd)}")
+    
+    frames = np.empty((max(frame_count, 1), height, width, 3), dtype=np.uint8)
+    count = 0
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE) as proc:
+        while True:
+            if count == len(frames):
+                frames = np.concatenate([frames, np.empty_like(frames)])
+            # Fill the next frame slot in place
+            view = memoryview(frames[count]).cast("B")
+            filled = 0
+            while filled < len(view):
+                n = proc.stdout.readinto(view[filled:])
+                if not n:
+                    break
+                filled += n
+            if filled < len(view):
+                break
+            count += 1
+    
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
+    
+    logger.info(f"Decoded {count} raw frames into memory")
+    return frames[:count]
+
+
+def encode_raw_frames(frames, output_path: Path, fps: float) -> None:
+    """Encode an RGB frame stack (frames, height, width, 3) to H.264."""
+    height, width = frames.shape[1:3]
+    cmd = [FFMPEG_BINARY] + FFMPEG_QUIET_ARGS + [
+        "-f", "rawvideo", "-pix_fmt", "rgb24",
+        "-s", f"{width}x{height}", "-r", str(fps),
+        "-i", "-",
+        "-c:v", "libx264",
+        "-preset", X264_PRESET,
+        "-pix_fmt", "yuv420p",
+        "-crf", str(X264_CRF),
+        "-y",
+        str(output_path)
+    ]
+    logger.debug(f"Running FFmpeg: {' '.join(cmd[:-1])} {output_path}")
+    
+    with subprocess.Popen(cmd, stdin=subprocess.PIPE) as proc:
+        # Hand the whole buffer to the pipe without a tobytes() copy
+        proc.stdin.write(memoryview(frames).cast("B"))
+        proc.stdin.close()
+    
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
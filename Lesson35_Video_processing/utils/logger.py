@@ -2,17 +2,22 @@
 Logging utilities with ring buffer implementation.
 
 This module provides a configured logger with rotating file handler
-that implements a ring buffer (20 files, 16MB each).
+that implements a ring buffer (20 files, 16MB each). File writes and
+rotation run on a background QueueListener thread, so logging calls
+never wait on the disk.
 
 Author: Yair Levi
 """
 
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+import queue
 import sys
 
 from ..config import (
+    ensure_dirs,
     LOG_FILENAME,
     LOG_MAX_BYTES,
     LOG_BACKUP_COUNT,
@@ -23,6 +28,8 @@ from ..config import (
 
 # Global logger instance
 _logger = None
+# Background thread that drains the queue into the rotating file handler
+_listener = None
 
 
 def setup_logger(name: str = "video_processing") -> logging.Logger:
@@ -38,11 +45,14 @@ def setup_logger(name: str = "video_processing") -> logging.Logger:
     Returns:
         logging.Logger: Configured logger instance
     """
-    global _logger
+    global _logger, _listener
     
     if _logger is not None:
         return _logger
     
+    # Make sure the log directory exists before opening the log file
+    ensure_dirs()
+    
     # Create logger
     logger = logging.getLogger(name)
     logger.setLevel(getattr(logging, LOG_LEVEL))
@@ -69,8 +79,18 @@ def setup_logger(name: str = "video_processing") -> logging.Logger:
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
     
+    # Hand file records to a queue; the listener thread does the write and
+    # any rotation (rename) off the caller's thread
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setLevel(getattr(logging, LOG_LEVEL))
+    _listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _listener.start()
+    # Flush whatever is still queued on interpreter exit
+    atexit.register(_listener.stop)
+    
     # Add handlers to logger
-    logger.addHandler(file_handler)
+    logger.addHandler(queue_handler)
     logger.addHandler(console_handler)
     
     _logger = logger
@@ -27,6 +27,13 @@ def format_bitrate(bitrate: int) -> str:
         return f"{bitrate} bps"
 
 
+def parse_frame_rate(rate: str) -> float:
+    """Convert an FFprobe rate string like '30000/1001' to frames per second."""
+    num, _, den = rate.partition('/')
+    den = int(den) if den else 1
+    return int(num) / den if den else 0.0
+
+
 def extract_stream_info(metadata: Dict) -> Tuple[Dict, Dict]:
     """Extract video and audio stream information from metadata."""
     video_info = None
@@ -40,7 +47,7 @@ def extract_stream_info(metadata: Dict) -> Tuple[Dict, Dict]:
                 'width': stream.get('width', 0),
                 'height': stream.get('height', 0),
                 'pix_fmt': stream.get('pix_fmt', 'Unknown'),
-                'fps': eval(stream.get('r_frame_rate', '0/1')),
+                'fps': parse_frame_rate(stream.get('r_frame_rate', '0/1')),
                 'bit_rate': int(stream.get('bit_rate', 0))
             }
         elif stream.get('codec_type') == 'audio' and audio_info is None:
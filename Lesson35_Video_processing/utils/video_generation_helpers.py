@@ -9,7 +9,7 @@ Author: Yair Levi
 from pathlib import Path
 from typing import Tuple
 
-from PIL import Image, ImageDraw
+from PIL import Image
 
 from ..config import (
     DEFAULT_OBJECT_WIDTH,
@@ -18,6 +18,9 @@ from ..config import (
     DEFAULT_BACKGROUND_COLOR
 )
 
+# Numba-compiled rectangle painter (built on first use, False if unavailable)
+_numba_painter = None
+
 
 def calculate_diagonal_position(
     frame_num: int,
@@ -51,6 +54,85 @@ def calculate_diagonal_position(
     return x, y
 
 
+def calculate_diagonal_positions(
+    total_frames: int,
+    width: int,
+    height: int,
+    obj_width: int,
+    obj_height: int
+):
+    """
+    Calculate object positions for every frame at once.
+    
+    Vectorized equivalent of calling calculate_diagonal_position for
+    frame_num = 0 .. total_frames - 1.
+    
+    Returns:
+        tuple: (xs, ys) integer numpy arrays of length total_frames
+    """
+    import numpy as np
+    
+    if total_frames > 1:
+        progress = np.arange(total_frames) / (total_frames - 1)
+    else:
+        progress = np.zeros(total_frames)
+    xs = (progress * (width - obj_width)).astype(np.intp)
+    ys = (progress * (height - obj_height)).astype(np.intp)
+    return xs, ys
+
+
+def paint_rectangles(frames, xs, ys, obj_width: int, obj_height: int,
+                     color: Tuple[int, int, int]) -> None:
+    """
+    Fill one rectangle per frame in a (frames, height, width, 3) stack.
+    
+    A single fancy-indexed assignment covers all frames, so there is no
+    per-frame Python work. Frames are modified in place.
+    """
+    import numpy as np
+    
+    painter = get_numba_painter()
+    if painter:
+        painter(frames, xs, ys, obj_width, obj_height, *color)
+        return
+    
+    n = len(frames)
+    rows = ys[:, None] + np.arange(obj_height)        # (n, obj_height)
+    cols = xs[:, None] + np.arange(obj_width)         # (n, obj_width)
+    frames[np.arange(n)[:, None, None], rows[:, :, None], cols[:, None, :]] = color
+
+
+def get_numba_painter():
+    """
+    Return a Numba-compiled, frame-parallel rectangle painter.
+    
+    Each thread fills the rectangles of its own frames (disjoint memory),
+    so large stacks are painted at memory bandwidth. Returns None when
+    Numba is not installed; paint_rectangles then uses numpy indexing.
+    """
+    global _numba_painter
+    
+    if _numba_painter is None:
+        try:
+            from numba import njit, prange
+        except ImportError:
+            _numba_painter = False
+            return None
+        
+        @njit(parallel=True, cache=True)
+        def painter(frames, xs, ys, obj_width, obj_height, c0, c1, c2):
+            for i in prange(frames.shape[0]):
+                for row in range(ys[i], ys[i] + obj_height):
+                    for col in range(xs[i], xs[i] + obj_width):
+                        frames[i, row, col, 0] = c0
+                        frames[i, row, col, 1] = c1
+                        frames[i, row, col, 2] = c2
+        
+        _numba_painter = painter
+    
+    return _numba_painter or None
+
+
 def create_frame_with_object(
     width: int,
     height: int,
@@ -79,13 +161,9 @@ def create_frame_with_object(
     """
     # Create background
     img = Image.new('RGB', (width, height), color=bg_color)
-    draw = ImageDraw.Draw(img)
     
-    # Draw rectangle
-    draw.rectangle(
-        [obj_x, obj_y, obj_x + obj_width, obj_y + obj_height],
-        fill=obj_color
-    )
+    # Fill the object box (paste copies rows; no drawing context needed)
+    img.paste(obj_color, (obj_x, obj_y, obj_x + obj_width, obj_y + obj_height))
     
     return img
 
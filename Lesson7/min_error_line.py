@@ -19,13 +19,28 @@ y_array = points[:,1].reshape(1,-1) # convert the "y" array from 1D to 2D with 1
 
 # Save 2 loops by using muliply vector a(100x1) by vector x(1x1000) to get matrix 100x1000 of ai*xj.
 # then do vector y_array(1x1000) adding and vector b_array(100x1) sbstruct.
-errors = (y_array - a_array * x_array - b_array) ** 2
-total_errors = np.sum(errors, axis=1)
+# All steps write into one 100x1000 buffer instead of creating a new matrix per operation.
+residuals = np.multiply(a_array, x_array)
+np.subtract(y_array, residuals, out=residuals)
+np.subtract(residuals, b_array, out=residuals)
+# einsum squares and sums each row in a single pass (sum of r*r per line).
+total_errors = np.einsum('ij,ij->i', residuals, residuals)
     
 index = np.argmin(total_errors) # find line index of minimum error.
 print("line with minimum errors is at index ",index)
 print("a (the slop) for the line is ",coefficients[index,0])
 print("b is ",coefficients[index,1])
+
+# Exact least-squares line for comparison: a = cov(x,y)/var(x), b = mean(y) - a*mean(x).
+# Two dot products over the 1000 points, and it is the true minimum (not best-of-100).
+x_centered = points[:,0] - points[:,0].mean()
+y_centered = points[:,1] - points[:,1].mean()
+a_ols = np.dot(x_centered, y_centered) / np.dot(x_centered, x_centered)
+b_ols = points[:,1].mean() - a_ols * points[:,0].mean()
+ols_residuals = points[:,1] - a_ols * points[:,0] - b_ols
+print("least squares line: a =", a_ols, ", b =", b_ols)
+print("total error: random search", total_errors[index], ", least squares", np.dot(ols_residuals, ols_residuals))
+
 xline = np.linspace(0,1,2)
 yline = coefficients[index,0]*xline + coefficients[index,1]
 
@@ -33,7 +48,9 @@ plt.scatter(points[:,0], points[:,1], color="red")  # x = first column, y = seco
 plt.xlabel("X-axis")
 plt.ylabel("Y-axis")
 plt.title("Scatter plot of points")
-plt.plot(xline,yline)
+plt.plot(xline,yline, label="best of random lines")
+plt.plot(xline, a_ols*xline + b_ols, linestyle="--", label="least squares")
+plt.legend()
 plt.show()
 
    
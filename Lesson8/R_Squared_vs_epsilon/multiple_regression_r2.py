@@ -16,9 +16,25 @@ Version: 1.0
 Python: 3.6+
 """
 
+import os
+
 import numpy as np
+import matplotlib
+
+# HEADLESS=1 renders the plot straight to a PNG with the non-interactive
+# Agg backend (no GUI event loop), e.g. for batch runs and benchmarks
+HEADLESS = os.environ.get('HEADLESS', '').strip().lower() not in ('', '0', 'false', 'no')
+if HEADLESS:
+    matplotlib.use('Agg')
+
 import matplotlib.pyplot as plt
 
+# Numba is optional; it compiles the R² reduction into a single fused loop
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 # =============================================================================
 # CONFIGURATION PARAMETERS
 # =============================================================================
@@ -44,6 +60,13 @@ EPSILON_MAX = 3.5
 
 SEED = 42                # Random seed for reproducibility
 
+# Floating-point type for X and the coefficients. Single precision is plenty
+# for this synthetic demo and halves memory traffic; the 20 epsilon values
+# and the per-epsilon R² arithmetic stay in double precision
+DTYPE = np.float32
+
+PLOT_OUTPUT_PATH = 'r_squared_comparison.png'  # Where the plot goes when HEADLESS
+
 # =============================================================================
 # STEP 1-4: GENERATE COEFFICIENTS
 # =============================================================================
@@ -61,17 +84,16 @@ def generate_coefficients(num_predictors, beta_0_range, beta_i_range, seed=None)
     Returns:
         np.ndarray: Array of coefficients [β₀, β₁, β₂, ..., β₅₀]
     """
-    if seed is not None:
-        np.random.seed(seed)
+    rng = np.random.default_rng(seed)
     
     # Step 3: Choose β₀ randomly between -0.5 and 0.5
-    beta_0 = np.random.uniform(beta_0_range[0], beta_0_range[1])
+    beta_0 = rng.uniform(beta_0_range[0], beta_0_range[1])
     
     # Step 4: Choose each βᵢ randomly between -0.9 and 0.9
-    beta_i = np.random.uniform(beta_i_range[0], beta_i_range[1], num_predictors)
+    beta_i = rng.uniform(beta_i_range[0], beta_i_range[1], num_predictors)
     
     # Combine into single array: [β₀, β₁, β₂, ..., β₅₀]
-    coefficients = np.concatenate([[beta_0], beta_i])
+    coefficients = np.concatenate([[beta_0], beta_i]).astype(DTYPE)
     
     return coefficients
 
@@ -92,14 +114,16 @@ def generate_x_data(num_samples, num_predictors, mu, sigma, seed=None):
         seed (int, optional): Random seed
     
     Returns:
-        np.ndarray: X matrix of shape (num_samples, num_predictors)
+        np.ndarray: X matrix of shape (num_samples, num_predictors), dtype DTYPE
     """
-    if seed is not None:
-        np.random.seed(seed + 1)  # Different seed for X
+    # Different seed for X
+    rng = np.random.default_rng(None if seed is None else seed + 1)
     
     # Step 5-6: Generate 50 predictors from Normal(μ=0, σ=1)
     # Each column is one predictor variable
-    X = np.random.normal(mu, sigma, (num_samples, num_predictors))
+    X = rng.standard_normal((num_samples, num_predictors), dtype=DTYPE)
+    X *= sigma
+    X += mu
     
     return X
 
@@ -147,44 +171,74 @@ def add_dependent_predictors(X, num_dependent, seed=None):
     Returns:
         np.ndarray: Extended X matrix with dependent predictors added
     """
-    if seed is not None:
-        np.random.seed(seed + 10)
+    rng = np.random.default_rng(None if seed is None else seed + 10)
     
     n_samples, n_predictors = X.shape
+    columns = np.arange(num_dependent)
     
     # Create dependent predictors as linear combinations
-    # Each dependent predictor is a weighted sum of 2-3 original predictors
-    dependent_predictors = np.zeros((n_samples, num_dependent))
+    # Each dependent predictor is a weighted sum of 2-3 original predictors,
+    # expressed as a sparse weight matrix W so that X @ W builds them all at once
+    W = np.zeros((n_predictors, num_dependent), dtype=X.dtype)
     
-    for i in range(num_dependent):
-        # Randomly select 2-3 predictors to combine
-        num_to_combine = np.random.randint(2, 4)
-        selected_indices = np.random.choice(n_predictors, num_to_combine, replace=False)
-        
-        # Random weights for combination
-        weights = np.random.uniform(-1, 1, num_to_combine)
-        
-        # Create dependent predictor as weighted sum
-        for j, idx in enumerate(selected_indices):
-            dependent_predictors[:, i] += weights[j] * X[:, idx]
-        
-        # Add small noise to make it not perfectly collinear
-        noise = np.random.normal(0, 0.1, n_samples)
-        dependent_predictors[:, i] += noise
+    # Randomly select 2-3 distinct predictors per column: the first 3 rows of
+    # a per-column random ordering, with the unused third slot weighted 0
+    num_to_combine = rng.integers(2, 4, size=num_dependent)
+    selected_indices = rng.random((n_predictors, num_dependent)).argsort(axis=0)[:3]
+    
+    # Random weights for combination
+    weights = rng.uniform(-1, 1, (3, num_dependent))
+    weights[np.arange(3)[:, None] >= num_to_combine] = 0
+    W[selected_indices, columns] = weights
     
-    # Concatenate original and dependent predictors
-    X_extended = np.hstack([X, dependent_predictors])
+    # Concatenate original and dependent predictors into one preallocated matrix
+    X_extended = np.empty((n_samples, n_predictors + num_dependent), dtype=X.dtype)
+    X_extended[:, :n_predictors] = X
+    X_extended[:, n_predictors:] = X @ W
+    
+    # Add small noise to make it not perfectly collinear
+    X_extended[:, n_predictors:] += rng.normal(0, 0.1, (n_samples, num_dependent))
     
     return X_extended
 
+def calculate_linear_part(X, coefficients):
+    """
+    Calculate β₀ + β₁*x₁ + ... + βₚ*xₚ for every sample using DOT PRODUCT.
+    
+    Equivalent to X_augmented · β, where X_augmented has a column of 1's
+    for the intercept, but without building that augmented copy of X:
+    β₀*1 is simply added to X · [β₁, ..., βₚ].
+    
+    Args:
+        X (np.ndarray): Predictor matrix, shape (n_samples, n_predictors)
+        coefficients (np.ndarray): Coefficients [β₀, β₁, ..., βₚ]
+    
+    Returns:
+        np.ndarray: Linear part of Y, shape (n_samples,)
+    """
+    # BLAS gemv needs both operands C-contiguous and of one dtype; with a
+    # mixed float32/float64 pair NumPy would first cast a copy of X
+    X = np.ascontiguousarray(X)
+    beta = np.ascontiguousarray(coefficients[1:], dtype=X.dtype)
+    
+    # Dot product of each row with [β₁, ..., βₚ], then add the intercept
+    Y_linear = np.dot(X, beta)
+    Y_linear += coefficients[0]
+    
+    return Y_linear
+
+
 def calculate_y_with_fixed_epsilon(X, coefficients, epsilon_value):
     """
     Calculate Y using the multiple linear regression equation with FIXED EPSILON.
     
+    Reference implementation: main() builds Y_linear once and sweeps all
+    epsilon values with calculate_r_squared_sweep instead.
+    
     Model: Y = β₀ + β₁*x₁ + β₂*x₂ + ... + β₅₀*x₅₀ + ε
     
     Using dot product:
-    Y = X_augmented · β + ε
+    Y = X_augmented · β + ε = X · [β₁, ..., β₅₀] + β₀ + ε
     
     Where:
     - X_augmented has a column of 1's for the intercept
@@ -198,21 +252,8 @@ def calculate_y_with_fixed_epsilon(X, coefficients, epsilon_value):
     Returns:
         tuple: (Y, Y_linear) where Y includes noise and Y_linear is without noise
     """
-    num_samples = X.shape[0]
-    
-    # Add column of 1's for intercept (augmented design matrix)
-    # Shape: (n_samples, 1)
-    ones = np.ones((num_samples, 1))
-    
-    # Augmented X: [1, x₁, x₂, ..., x₅₀]
-    # Shape: (n_samples, n_predictors + 1)
-    X_augmented = np.hstack([ones, X])
-    
-    # Calculate linear part using DOT PRODUCT
     # For each sample: y_linear = β₀*1 + β₁*x₁ + β₂*x₂ + ... + β₅₀*x₅₀
-    # Matrix multiplication: X_augmented @ coefficients
-    # This is equivalent to: dot product of each row with coefficient vector
-    Y_linear = np.dot(X_augmented, coefficients)
+    Y_linear = calculate_linear_part(X, coefficients)
     
     # Step 8: Add FIXED epsilon to all predictions
     # Same epsilon value added to all samples
@@ -225,10 +266,33 @@ def calculate_y_with_fixed_epsilon(X, coefficients, epsilon_value):
 # STEP 9: CALCULATE R-SQUARED USING DOT PRODUCT
 # =============================================================================
 
+def _residual_sums(Y_true, Y_predicted):
+    """
+    Return (dot(r, r), Σrᵢ) for residuals rᵢ = yᵢ - ŷᵢ in a single pass.
+    
+    Compiled with Numba when available; the residuals are streamed once
+    and never stored.
+    """
+    sum_sq = 0.0
+    total = 0.0
+    for i in range(Y_true.shape[0]):
+        residual = Y_true[i] - Y_predicted[i]
+        sum_sq += residual * residual
+        total += residual
+    return sum_sq, total
+
+
+_residual_sums_jit = njit(cache=True, fastmath=True)(_residual_sums) if njit else None
+
+
 def calculate_r_squared(Y_observed, Y_predicted):
     """
     Calculate R² (coefficient of determination) using DOT PRODUCT.
     
+    Reference implementation for a single epsilon value; main() uses
+    calculate_r_squared_sweep, which gives the same values for all
+    epsilons from one pass over the residuals.
+    
     R² = 1 - (SS_res / SS_tot)
     
     Where:
@@ -253,16 +317,19 @@ def calculate_r_squared(Y_observed, Y_predicted):
     # Difference between observed and predicted
     residuals = Y_observed - Y_predicted
     
-    # Calculate deviations from mean: (yᵢ - ȳ)
-    deviations = Y_observed - Y_mean
-    
     # Calculate SS_res using DOT PRODUCT
     # SS_res = Σ(yᵢ - ŷᵢ)² = dot(residuals, residuals)
-    SS_res = np.dot(residuals, residuals)
+    # (einsum spells out the same dot product without a BLAS call, which
+    # costs more than the arithmetic itself for vectors this short)
+    SS_res = np.einsum('i,i->', residuals, residuals)
+    
+    # Calculate deviations from mean: (yᵢ - ȳ)
+    # Reuses the residuals buffer instead of allocating a new array
+    deviations = np.subtract(Y_observed, Y_mean, out=residuals)
     
     # Calculate SS_tot using DOT PRODUCT
     # SS_tot = Σ(yᵢ - ȳ)² = dot(deviations, deviations)
-    SS_tot = np.dot(deviations, deviations)
+    SS_tot = np.einsum('i,i->', deviations, deviations)
     
     # Calculate R²
     # R² = 1 - (SS_res / SS_tot)
@@ -276,33 +343,21 @@ def calculate_r_squared(Y_observed, Y_predicted):
     return r_squared
 
 
-def calculate_adjusted_r_squared(Y_observed, Y_predicted, n_samples, n_predictors):
+def adjust_r_squared(r_squared, n_samples, n_predictors):
     """
-    Calculate Adjusted R² which accounts for number of predictors.
-    
-    Adjusted R² = 1 - [(1 - R²) * (n - 1) / (n - p - 1)]
+    Convert R² into Adjusted R² for a model with n_predictors predictors.
     
-    Where:
-    - n = number of samples
-    - p = number of predictors (excluding intercept)
-    - R² = regular coefficient of determination
-    
-    Adjusted R² penalizes for adding predictors that don't improve the model.
-    It can be negative if the model is very poor.
+    The adjustment factor (n - 1) / (n - p - 1) is constant per model, so
+    this works element-wise on a whole array of R² values (one per epsilon).
     
     Args:
-        Y_observed (np.ndarray): Observed Y values
-        Y_predicted (np.ndarray): Predicted Y values
+        r_squared (float or np.ndarray): R² value(s)
         n_samples (int): Number of observations
         n_predictors (int): Number of predictor variables (excluding intercept)
     
     Returns:
-        float: Adjusted R² value
+        float or np.ndarray: Adjusted R² value(s)
     """
-    # First calculate regular R²
-    r_squared = calculate_r_squared(Y_observed, Y_predicted)
-    
-    # Calculate Adjusted R²
     # Formula: Adj_R² = 1 - [(1 - R²) * (n - 1) / (n - p - 1)]
     if n_samples <= n_predictors + 1:
         # Not enough samples for adjustment
@@ -314,12 +369,76 @@ def calculate_adjusted_r_squared(Y_observed, Y_predicted, n_samples, n_predictor
     return adjusted_r_squared
 
 
+def calculate_total_sum_of_squares(Y_true, Y_mean=None):
+    """
+    Calculate SS_tot = Σ(yᵢ - ȳ)² using DOT PRODUCT.
+    
+    Adding a fixed ε to every yᵢ shifts ȳ by the same ε, so this value is
+    shared by every epsilon and by both models: compute it once.
+    
+    Args:
+        Y_true (np.ndarray): Y values without noise
+        Y_mean (float, optional): Precomputed mean of Y_true
+    
+    Returns:
+        float: Total sum of squares
+    """
+    if Y_mean is None:
+        Y_mean = np.mean(Y_true)
+    deviations = Y_true - Y_mean
+    return np.dot(deviations, deviations)
+
+
+def calculate_r_squared_sweep(Y_true, Y_predicted, epsilon_values, SS_tot=None):
+    """
+    Calculate R² for every fixed epsilon value at once.
+    
+    Y_observed = Y_true + ε is only a constant shift of Y_true, so with
+    base residuals rᵢ = yᵢ - ŷᵢ:
+    - SS_res(ε) = Σ(rᵢ + ε)² = dot(r, r) + 2ε·Σrᵢ + n·ε²
+    - SS_tot is the same for every ε (the shift cancels in yᵢ - ȳ)
+    
+    One dot product per model replaces a full pass per epsilon value.
+    
+    Args:
+        Y_true (np.ndarray): Y values without noise, shape (n_samples,)
+        Y_predicted (np.ndarray): Predicted Y values, shape (n_samples,)
+        epsilon_values (np.ndarray): Fixed epsilon values, shape (n_epsilon,)
+        SS_tot (float, optional): Precomputed calculate_total_sum_of_squares(Y_true)
+    
+    Returns:
+        np.ndarray: R² value for each epsilon, shape (n_epsilon,)
+    """
+    # Base residuals (ε = 0): (yᵢ - ŷᵢ), reduced to dot(r, r) and Σrᵢ
+    if _residual_sums_jit is not None:
+        residual_sum_sq, residual_sum = _residual_sums_jit(Y_true, Y_predicted)
+    else:
+        residuals = Y_true - Y_predicted
+        residual_sum_sq = np.dot(residuals, residuals)
+        residual_sum = residuals.sum()
+    
+    # SS_res for every ε from those two scalars
+    SS_res = (residual_sum_sq
+              + 2 * epsilon_values * residual_sum
+              + len(Y_true) * epsilon_values ** 2)
+    
+    # SS_tot does not depend on epsilon (or on the model)
+    if SS_tot is None:
+        SS_tot = calculate_total_sum_of_squares(Y_true)
+    
+    if SS_tot == 0:
+        return np.ones(len(epsilon_values))  # Perfect fit if no variance
+    
+    return 1 - (SS_res / SS_tot)
+
+
 # =============================================================================
 # STEP 10: VISUALIZATION
 # =============================================================================
 
 def plot_r_squared_comparison(epsilon_values, r_squared_original, r_squared_dependent, 
-                             adj_r_squared_original, adj_r_squared_dependent):
+                             adj_r_squared_original, adj_r_squared_dependent,
+                             output_path=None):
     """
     Draw graph comparing R² and Adjusted R² for both models.
     
@@ -329,28 +448,32 @@ def plot_r_squared_comparison(epsilon_values, r_squared_original, r_squared_depe
         r_squared_dependent (np.ndarray): R² values with 55 predictors
         adj_r_squared_original (np.ndarray): Adjusted R² for original 50 predictors
         adj_r_squared_dependent (np.ndarray): Adjusted R² for 55 predictors
+        output_path (str, optional): Save the plot to this file instead of
+            showing it in a window
     """
-    plt.figure(figsize=(16, 9))
-    
-    # Plot R² for original predictors (50) - SOLID LINE
-    plt.plot(epsilon_values, r_squared_original, 'b-o', linewidth=2.5, 
-             markersize=8, markerfacecolor='lightblue', markeredgecolor='navy',
-             label='R² - Original (50 predictors)', alpha=0.8)
-    
-    # Plot R² for model with dependent predictors (55) - SOLID LINE
-    plt.plot(epsilon_values, r_squared_dependent, 'g-s', linewidth=2.5,
-             markersize=7, markerfacecolor='lightgreen', markeredgecolor='darkgreen',
-             label='R² - With multicollinearity (55 predictors)', alpha=0.8)
-    
-    # Plot Adjusted R² for original predictors (50) - DASHED LINE
-    plt.plot(epsilon_values, adj_r_squared_original, 'b--^', linewidth=2, 
-             markersize=6, markerfacecolor='cyan', markeredgecolor='navy',
-             label='Adj R² - Original (50 predictors)', alpha=0.8)
-    
-    # Plot Adjusted R² for model with dependent predictors (55) - DASHED LINE
-    plt.plot(epsilon_values, adj_r_squared_dependent, 'g--d', linewidth=2,
-             markersize=6, markerfacecolor='lime', markeredgecolor='darkgreen',
-             label='Adj R² - With multicollinearity (55 predictors)', alpha=0.8)
+    fig = plt.figure(figsize=(16, 9))
+    
+    # R² = SOLID LINES, Adjusted R² = DASHED LINES
+    # Blue = original predictors (50), green = with dependent predictors (55)
+    series = [
+        (r_squared_original, 'b-o',
+         dict(linewidth=2.5, markersize=8, markerfacecolor='lightblue',
+              markeredgecolor='navy', label='R² - Original (50 predictors)')),
+        (r_squared_dependent, 'g-s',
+         dict(linewidth=2.5, markersize=7, markerfacecolor='lightgreen',
+              markeredgecolor='darkgreen',
+              label='R² - With multicollinearity (55 predictors)')),
+        (adj_r_squared_original, 'b--^',
+         dict(linewidth=2, markersize=6, markerfacecolor='cyan',
+              markeredgecolor='navy', label='Adj R² - Original (50 predictors)')),
+        (adj_r_squared_dependent, 'g--d',
+         dict(linewidth=2, markersize=6, markerfacecolor='lime',
+              markeredgecolor='darkgreen',
+              label='Adj R² - With multicollinearity (55 predictors)')),
+    ]
+    ax = fig.gca()
+    for values, fmt, style in series:
+        ax.plot(epsilon_values, values, fmt, alpha=0.8, **style)
     
     # Add reference lines
     plt.axhline(y=1.0, color='red', linestyle='--', linewidth=1, 
@@ -423,7 +546,12 @@ def plot_r_squared_comparison(epsilon_values, r_squared_original, r_squared_depe
              fontsize=9)
     
     plt.tight_layout()
-    plt.show()
+    
+    if output_path is None:
+        plt.show()
+    else:
+        fig.savefig(output_path, dpi=100, bbox_inches='tight')
+        plt.close(fig)
 
 
 # =============================================================================
@@ -491,8 +619,9 @@ def main():
           f"max={coefficients_original[1:].max():.6f}")
     
     # Generate additional coefficients for dependent predictors
-    np.random.seed(SEED + 50)
-    coefficients_dependent = np.random.uniform(BETA_I_MIN, BETA_I_MAX, NUM_DEPENDENT_PREDICTORS)
+    rng = np.random.default_rng(SEED + 50)
+    coefficients_dependent = rng.uniform(
+        BETA_I_MIN, BETA_I_MAX, NUM_DEPENDENT_PREDICTORS).astype(DTYPE)
     coefficients_extended = np.concatenate([coefficients_original, coefficients_dependent])
     
     print(f"\nGenerated {NUM_DEPENDENT_PREDICTORS} additional coefficients for dependent predictors:")
@@ -532,46 +661,45 @@ def main():
     print(f"Formula: Y_true = β₀ + β₁x₁ + ... + β₅₀x₅₀ + β₅₁x₅₁ + ... + β₅₅x₅₅")
     
     # Calculate base Y_linear using extended model (without epsilon)
-    ones = np.ones((NUM_SAMPLES, 1))
-    X_extended_augmented = np.hstack([ones, X_extended])
-    Y_linear_true = np.dot(X_extended_augmented, coefficients_extended)
+    # The first 50 columns of X_extended are X_original, so Y_true splits into
+    # the original model's prediction plus the 5 dependent predictors' part
+    # ORIGINAL MODEL: Predict using only first 50 predictors
+    Y_pred_original = calculate_linear_part(X_original, coefficients_original)
+    X_dependent = X_extended[:, NUM_PREDICTORS:]
+    Y_linear_true = Y_pred_original + np.dot(X_dependent, coefficients_dependent)
+    
+    # Mean and SS_tot are computed once and reused: the std below and the R²
+    # of both models (for every epsilon) all derive from them
+    Y_linear_mean = Y_linear_true.mean()
+    SS_tot = calculate_total_sum_of_squares(Y_linear_true, Y_linear_mean)
     
     print(f"  Y_linear shape:              {Y_linear_true.shape}")
-    print(f"  Y_linear mean:               {Y_linear_true.mean():.6f}")
-    print(f"  Y_linear std:                {Y_linear_true.std():.6f}")
+    print(f"  Y_linear mean:               {Y_linear_mean:.6f}")
+    print(f"  Y_linear std:                {np.sqrt(SS_tot / NUM_SAMPLES):.6f}")
     
     # Step 8-9: Calculate R² and Adj R² for BOTH MODELS across all epsilon values
     print_section_header("STEP 8-9: CALCULATING METRICS FOR BOTH MODELS")
-    print("Processing each epsilon value for both models...")
-    
-    r_squared_original = np.zeros(NUM_EPSILON_VALUES)
-    adj_r_squared_original = np.zeros(NUM_EPSILON_VALUES)
-    r_squared_extended = np.zeros(NUM_EPSILON_VALUES)
-    adj_r_squared_extended = np.zeros(NUM_EPSILON_VALUES)
-    
-    # Prepare augmented matrices for predictions
-    X_original_augmented = np.hstack([ones, X_original])
-    
-    for i, epsilon_val in enumerate(epsilon_values):
-        # Add epsilon to true Y
-        Y_observed = Y_linear_true + epsilon_val
-        
-        # ORIGINAL MODEL: Predict using only first 50 predictors
-        Y_pred_original = np.dot(X_original_augmented, coefficients_original)
-        r2_orig = calculate_r_squared(Y_observed, Y_pred_original)
-        adj_r2_orig = calculate_adjusted_r_squared(Y_observed, Y_pred_original, 
-                                                   NUM_SAMPLES, NUM_PREDICTORS)
-        r_squared_original[i] = r2_orig
-        adj_r_squared_original[i] = adj_r2_orig
-        
-        # EXTENDED MODEL: Predict using all 55 predictors
-        Y_pred_extended = np.dot(X_extended_augmented, coefficients_extended)
-        r2_ext = calculate_r_squared(Y_observed, Y_pred_extended)
-        adj_r2_ext = calculate_adjusted_r_squared(Y_observed, Y_pred_extended,
-                                                  NUM_SAMPLES, 
-                                                  NUM_PREDICTORS + NUM_DEPENDENT_PREDICTORS)
-        r_squared_extended[i] = r2_ext
-        adj_r_squared_extended[i] = adj_r2_ext
+    print("Processing all epsilon values for both models...")
+    
+    # Predictions do not depend on epsilon: compute them once
+    # (Y_pred_original was already computed above, as part of Y_true)
+    # EXTENDED MODEL: Predict using all 55 predictors - with the same
+    # coefficients that generated Y, this is exactly Y_true, so its
+    # residuals are just ε (SS_res = n·ε²)
+    Y_pred_extended = Y_linear_true
+    
+    # R² for all epsilon values at once (no per-epsilon loop)
+    # Both models are scored against the same Y, so SS_tot is shared
+    r_squared_original = calculate_r_squared_sweep(
+        Y_linear_true, Y_pred_original, epsilon_values, SS_tot)
+    r_squared_extended = calculate_r_squared_sweep(
+        Y_linear_true, Y_pred_extended, epsilon_values, SS_tot)
+    
+    # Adjusted R² for all epsilon values, straight from the R² arrays
+    adj_r_squared_original = adjust_r_squared(
+        r_squared_original, NUM_SAMPLES, NUM_PREDICTORS)
+    adj_r_squared_extended = adjust_r_squared(
+        r_squared_extended, NUM_SAMPLES, NUM_PREDICTORS + NUM_DEPENDENT_PREDICTORS)
     
     print(f"\nOriginal Model (50 predictors) Statistics:")
     print(f"  R² Mean:                     {r_squared_original.mean():.6f}")
@@ -648,7 +776,8 @@ def main():
     print("  • Adjusted R² comparison shows true model quality")
     
     plot_r_squared_comparison(epsilon_values, r_squared_original, r_squared_extended,
-                             adj_r_squared_original, adj_r_squared_extended)
+                             adj_r_squared_original, adj_r_squared_extended,
+                             output_path=PLOT_OUTPUT_PATH if HEADLESS else None)
     
     # Completion
     print("\n" + "=" * 80)
@@ -661,7 +790,10 @@ def main():
     print(f"  • R² for extended ≥ R² for original (as expected)")
     print(f"  • Adjusted R² shows penalty for extra complexity")
     print(f"  • Demonstrates why Adjusted R² is better for model comparison")
-    print("\nClose the plot window to exit.\n")
+    if HEADLESS:
+        print(f"\nPlot saved to {PLOT_OUTPUT_PATH}\n")
+    else:
+        print("\nClose the plot window to exit.\n")
 
 
 # =============================================================================
@@ -0,0 +1,6 @@
+"""
+Test suite for R² vs epsilon analysis.
+Author: Yair Levi
+"""
+
+# Test package initialization
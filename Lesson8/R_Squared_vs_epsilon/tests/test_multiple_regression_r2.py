@@ -0,0 +1,91 @@
+"""
+Unit tests for the R² computations.
+Author: Yair Levi
+"""
+
+import os
+import numpy as np
+from pathlib import Path
+import sys
+
+# Render with the non-interactive backend when the module is imported
+os.environ.setdefault('HEADLESS', '1')
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import multiple_regression_r2 as r2
+
+
+def make_model(num_samples=100, num_predictors=10, seed=0):
+    """Build X, coefficients, the noise-free Y and a fitted prediction."""
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((num_samples, num_predictors))
+    coefficients = rng.uniform(-0.9, 0.9, num_predictors + 1)
+    Y_true = r2.calculate_linear_part(X, coefficients)
+    Y_predicted = Y_true + rng.normal(0, 0.3, num_samples)
+    return X, coefficients, Y_true, Y_predicted
+
+
+class TestRSquaredSweep:
+    """Test calculate_r_squared_sweep against the per-epsilon computation."""
+    
+    def test_matches_per_epsilon_r_squared(self):
+        """Test every epsilon against calculate_r_squared on Y + ε."""
+        X, coefficients, Y_true, Y_predicted = make_model()
+        epsilon_values = np.linspace(-3.5, 3.5, 20)
+        
+        sweep = r2.calculate_r_squared_sweep(Y_true, Y_predicted, epsilon_values)
+        
+        expected = [
+            r2.calculate_r_squared(
+                r2.calculate_y_with_fixed_epsilon(X, coefficients, epsilon)[0],
+                Y_predicted
+            )
+            for epsilon in epsilon_values
+        ]
+        np.testing.assert_allclose(sweep, expected, rtol=1e-9, atol=1e-12)
+    
+    def test_precomputed_total_sum_of_squares(self):
+        """Test that passing SS_tot gives the same values."""
+        _, _, Y_true, Y_predicted = make_model(seed=1)
+        epsilon_values = np.array([-1.0, 0.0, 2.5])
+        SS_tot = r2.calculate_total_sum_of_squares(Y_true)
+        
+        np.testing.assert_allclose(
+            r2.calculate_r_squared_sweep(Y_true, Y_predicted, epsilon_values, SS_tot),
+            r2.calculate_r_squared_sweep(Y_true, Y_predicted, epsilon_values)
+        )
+    
+    def test_perfect_fit_at_zero_epsilon(self):
+        """Test R² = 1 for an exact prediction without noise."""
+        _, _, Y_true, _ = make_model(seed=2)
+        
+        sweep = r2.calculate_r_squared_sweep(Y_true, Y_true, np.array([0.0, 1.0]))
+        
+        assert sweep[0] == 1.0
+        assert sweep[1] < 1.0
+    
+    def test_constant_observations(self):
+        """Test the zero-variance case."""
+        Y_true = np.full(10, 3.0)
+        
+        sweep = r2.calculate_r_squared_sweep(Y_true, Y_true, np.array([0.0, 1.0]))
+        
+        np.testing.assert_array_equal(sweep, [1.0, 1.0])
+
+
+class TestAdjustRSquared:
+    """Test the Adjusted R² conversion."""
+    
+    def test_formula(self):
+        """Test Adj R² = 1 - (1 - R²)(n - 1)/(n - p - 1) element-wise."""
+        r_squared = np.array([0.9, 0.5])
+        
+        adjusted = r2.adjust_r_squared(r_squared, 100, 10)
+        
+        np.testing.assert_allclose(adjusted, 1 - (1 - r_squared) * 99 / 89)
+    
+    def test_too_few_samples(self):
+        """Test that R² is returned unchanged when n <= p + 1."""
+        assert r2.adjust_r_squared(0.7, 5, 4) == 0.7
@@ -10,8 +10,16 @@ Version: 1.0
 Python: 3.6+
 """
 
+import argparse
+
 import numpy as np
-import matplotlib.pyplot as plt
+import matplotlib
+
+# Numba is optional; it fuses the four sums of estimate_coefficients into one loop
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 # Configuration parameters
 NUM_POINTS = 1000        # Number of data points to generate
@@ -39,21 +47,55 @@ def generate_data(n_points, mu_x, sigma_x, beta_0, beta_1, epsilon_sigma, seed=N
     Returns:
         tuple: (X, Y) arrays
     """
-    if seed is not None:
-        np.random.seed(seed)
+    # Local Generator (PCG64) instead of the legacy global np.random state
+    rng = np.random.default_rng(seed)
     
-    # Generate X points from normal distribution
-    X = np.random.normal(mu_x, sigma_x, n_points)
+    # Generate X points from normal distribution (standard normal, scaled in place)
+    X = rng.standard_normal(n_points)
+    X *= sigma_x
+    X += mu_x
     
     # Generate epsilon (noise) from normal distribution
-    epsilon = np.random.normal(0, epsilon_sigma, n_points)
+    epsilon = rng.standard_normal(n_points)
+    epsilon *= epsilon_sigma
     
     # Calculate Y using the equation: Y = β₀ + β₁*X + ε
-    Y = beta_0 + beta_1 * X + epsilon
+    Y = beta_1 * X
+    Y += beta_0
+    Y += epsilon
     
     return X, Y
 
 
+def _estimate_coefficients_loop(X, Y):
+    """
+    Single-loop version of estimate_coefficients (compiled with Numba).
+    
+    Accumulates sum(X), sum(Y), dot(X, X) and dot(X, Y) in one pass.
+    """
+    n = X.shape[0]
+    sum_x = 0.0
+    sum_y = 0.0
+    sum_xx = 0.0
+    sum_xy = 0.0
+    for i in range(n):
+        sum_x += X[i]
+        sum_y += Y[i]
+        sum_xx += X[i] * X[i]
+        sum_xy += X[i] * Y[i]
+    
+    beta_1_est = (sum_xy - sum_x * sum_y / n) / (sum_xx - sum_x * sum_x / n)
+    beta_0_est = (sum_y - beta_1_est * sum_x) / n
+    return beta_0_est, beta_1_est
+
+
+# Signature given up front: compiled (or loaded from cache) at import time,
+# so the first call does not pay for JIT compilation
+_estimate_coefficients_jit = njit(
+    'UniTuple(float64, 2)(float64[:], float64[:])', cache=True, fastmath=True
+)(_estimate_coefficients_loop) if njit else None
+
+
 def estimate_coefficients(X, Y):
     """
     Estimate β₀ and β₁ using least squares formulas with dot product.
@@ -62,6 +104,10 @@ def estimate_coefficients(X, Y):
     β₁ = sum((Xi - X_avg) * (Yi - Y_avg)) / sum((Xi - X_avg)²)
     β₀ = Y_avg - β₁ * X_avg
     
+    The centred sums are expanded so that no deviation arrays are needed:
+    sum((Xi - X_avg) * (Yi - Y_avg)) = dot(X, Y) - n * X_avg * Y_avg
+    sum((Xi - X_avg)²)              = dot(X, X) - n * X_avg²
+    
     Args:
         X (np.ndarray): X values
         Y (np.ndarray): Y values
@@ -69,30 +115,35 @@ def estimate_coefficients(X, Y):
     Returns:
         tuple: (beta_0_estimated, beta_1_estimated)
     """
-    # Calculate averages using vector operations
-    X_avg = np.mean(X)
-    Y_avg = np.mean(Y)
+    if (_estimate_coefficients_jit is not None and X.ndim == 1
+            and X.dtype == np.float64 and Y.dtype == np.float64):
+        # Same formulas, all four sums accumulated in one compiled loop
+        return _estimate_coefficients_jit(X, Y)
+    
+    n = X.size
     
-    # Calculate deviations from mean (vectorized)
-    X_dev = X - X_avg  # (Xi - X_avg) for all i
-    Y_dev = Y - Y_avg  # (Yi - Y_avg) for all i
+    # Plain sums and dot products: single passes, no temporary arrays
+    sum_x = X.sum()
+    sum_y = Y.sum()
+    sum_xx = np.dot(X, X)
+    sum_xy = np.dot(X, Y)
     
     # Calculate beta_1 using the formula with DOT PRODUCT
-    # β₁ = sum((Xi - X_avg) * (Yi - Y_avg)) / sum((Xi - X_avg)²)
-    # Numerator: dot product of X_dev and Y_dev
-    numerator = np.dot(X_dev, Y_dev)
-    # Denominator: dot product of X_dev with itself
-    denominator = np.dot(X_dev, X_dev)
+    # Numerator:   dot(X_dev, Y_dev) = dot(X, Y) - sum(X) * sum(Y) / n
+    numerator = sum_xy - sum_x * sum_y / n
+    # Denominator: dot(X_dev, X_dev) = dot(X, X) - sum(X)² / n
+    denominator = sum_xx - sum_x * sum_x / n
     beta_1_est = numerator / denominator
     
     # Calculate beta_0 using the formula
     # β₀ = Y_avg - β₁ * X_avg
-    beta_0_est = Y_avg - beta_1_est * X_avg
+    beta_0_est = (sum_y - beta_1_est * sum_x) / n
     
     return beta_0_est, beta_1_est
 
 
-def plot_data_and_lines(X, Y, beta_0_true, beta_1_true, beta_0_est, beta_1_est):
+def plot_data_and_lines(X, Y, beta_0_true, beta_1_true, beta_0_est, beta_1_est,
+                        output_path=None):
     """
     Draw the points, true line, and estimated line in one graph.
     
@@ -103,12 +154,20 @@ def plot_data_and_lines(X, Y, beta_0_true, beta_1_true, beta_0_est, beta_1_est):
         beta_1_true (float): True slope parameter
         beta_0_est (float): Estimated intercept parameter
         beta_1_est (float): Estimated slope parameter
+        output_path (str, optional): Save the plot to this file instead of
+            showing it
     """
-    plt.figure(figsize=(12, 8))
+    if output_path is not None:
+        # Non-interactive backend: render straight to the file, no GUI loop
+        matplotlib.use('Agg')
+    # Imported here so --no-plot runs never load pyplot
+    import matplotlib.pyplot as plt
     
-    # Plot the data points
+    fig = plt.figure(figsize=(12, 8))
+    
+    # Plot the data points (rasterized: one image instead of a vector path per point)
     plt.scatter(X, Y, alpha=0.4, s=20, c='blue', edgecolors='navy', 
-                label=f'Data Points (n={len(X)})')
+                label=f'Data Points (n={len(X)})', rasterized=True)
     
     # Draw the true regression line (without noise)
     x_line = np.linspace(X.min(), X.max(), 100)
@@ -131,7 +190,12 @@ def plot_data_and_lines(X, Y, beta_0_true, beta_1_true, beta_0_est, beta_1_est):
     
     # Show the plot
     plt.tight_layout()
-    plt.show()
+    
+    if output_path is None:
+        plt.show()
+    else:
+        fig.savefig(output_path, dpi=100)
+        plt.close(fig)
 
 
 def print_results(beta_0_true, beta_1_true, beta_0_est, beta_1_est):
@@ -165,8 +229,31 @@ def print_results(beta_0_true, beta_1_true, beta_0_est, beta_1_est):
     print("\n" + "=" * 70)
 
 
-def main():
+def parse_args(argv=None):
+    """
+    Parse command line options.
+    
+    Args:
+        argv (list, optional): Arguments to parse (default: sys.argv[1:])
+    
+    Returns:
+        argparse.Namespace: Parsed options
+    """
+    parser = argparse.ArgumentParser(
+        description="Generate linear data and estimate its regression coefficients."
+    )
+    plot_options = parser.add_mutually_exclusive_group()
+    plot_options.add_argument('--no-plot', action='store_true',
+                              help="skip drawing the plot (batch runs, benchmarking)")
+    plot_options.add_argument('--save', metavar='PATH',
+                              help="save the plot to PATH instead of opening a window")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main function to run the complete analysis."""
+    args = parse_args(argv)
+    
     print("=" * 70)
     print("LINEAR REGRESSION WITH COEFFICIENT ESTIMATION")
     print("=" * 70)
@@ -198,8 +285,16 @@ def main():
     print_results(BETA_0, BETA_1, beta_0_est, beta_1_est)
     
     # Step 3: Plot the data and lines
-    print(f"\n[Step 3] Displaying plot with data points and lines...")
-    plot_data_and_lines(X, Y, BETA_0, BETA_1, beta_0_est, beta_1_est)
+    if args.no_plot:
+        print(f"\n[Step 3] Plot skipped (--no-plot)")
+    elif args.save:
+        print(f"\n[Step 3] Saving plot with data points and lines...")
+        plot_data_and_lines(X, Y, BETA_0, BETA_1, beta_0_est, beta_1_est,
+                            output_path=args.save)
+        print(f"  Plot saved to {args.save}")
+    else:
+        print(f"\n[Step 3] Displaying plot with data points and lines...")
+        plot_data_and_lines(X, Y, BETA_0, BETA_1, beta_0_est, beta_1_est)
     
     print("\nAnalysis complete!")
     print("=" * 70)
@@ -16,32 +16,43 @@ x = np.sin(t)
 # Find the peak in the first cycle (occurs at pi/2)
 peak_index = samples_per_cycle // 4  # Peak occurs at quarter cycle
 
-# Extract 30 samples centered around the peak (15 before, peak, 14 after)
+# Take 30 samples centered around the peak (15 before, peak, 14 after)
 half_window = 15
 h_start = peak_index - half_window
 h_end = peak_index + half_window
-h = x[h_start:h_end + 1]  # 30 samples including the peak
+# Computed directly from sin() on the same time grid as x (t[i] = i * dt),
+# so the template does not depend on the full signal being generated first
+dt = cycles * 2 * np.pi / (total_samples - 1)
+h = np.sin(np.arange(h_start, h_end + 1) * dt)  # 30 samples including the peak
 
-# Flip h for proper convolution (template matching)
+# Flip h for proper convolution (template matching); np.flip returns a view.
+# The grid does not put a sample exactly on pi/2, so h is not quite symmetric.
 h_flipped = np.flip(h)
 
 # 3. Run convolution between x and h
-# Using 'same' mode to keep output same size as x
-output = np.convolve(x, h_flipped, mode='same')
+# Computed with the FFT: convolution in time is multiplication in frequency,
+# O(N log N) instead of the O(N*M) direct sum of np.convolve.
+# Zero-pad both to a power of two >= the full convolution length (no wrap-around)
+full_length = len(x) + len(h_flipped) - 1
+nfft = 1 << (full_length - 1).bit_length()
+output_full = np.fft.irfft(np.fft.rfft(x, nfft) * np.fft.rfft(h_flipped, nfft), nfft)
+
+# Keep the centre part, same size as x (like np.convolve(..., mode='same'))
+same_start = (len(h_flipped) - 1) // 2
+output = output_full[same_start:same_start + len(x)]
 
 # Find peak locations in the convolution output
 # Peaks should occur approximately every 200 samples
 threshold = np.max(output) * 0.9  # 90% of maximum
-peak_locations = []
-for i in range(1, len(output) - 1):
-    if output[i] > output[i-1] and output[i] > output[i+1] and output[i] > threshold:
-        peak_locations.append(i)
+# Compare every inner sample with both neighbours at once (shifted slices)
+center = output[1:-1]
+is_peak = (center > output[:-2]) & (center > output[2:]) & (center > threshold)
+peak_locations = np.nonzero(is_peak)[0] + 1
 
-# Remove duplicate detections (peaks within 100 samples of each other)
-filtered_peaks = []
-for peak in peak_locations:
-    if not filtered_peaks or peak - filtered_peaks[-1] > 100:
-        filtered_peaks.append(peak)
+# Remove duplicate detections (peaks within 100 samples of the previous one)
+keep = np.diff(peak_locations, prepend=-np.inf) > 100
+filtered_peak_indices = peak_locations[keep]
+filtered_peaks = filtered_peak_indices.tolist()
 
 print(f"Number of detected peaks: {len(filtered_peaks)}")
 print(f"Peak locations (sample indices): {filtered_peaks}")
@@ -88,4 +99,6 @@ print(f"Total samples: {total_samples}")
 print(f"Samples per cycle: {samples_per_cycle}")
 print(f"Template length: {len(h)} samples")
 print(f"Expected peak spacing: ~{samples_per_cycle} samples")
-print(f"Actual peak spacings: {[filtered_peaks[i+1] - filtered_peaks[i] for i in range(len(filtered_peaks)-1)]}")
\ No newline at end of file
+# Distance between consecutive peaks (one vectorized subtraction)
+peak_spacings = np.diff(filtered_peak_indices).tolist()
+print(f"Actual peak spacings: {peak_spacings}")
\ No newline at end of file
@@ -7,35 +7,62 @@ fig = plt.figure()
 ax = fig.add_subplot(111)
 plt.title("Rotate Rectangle", color='red')
 
-line, = ax.plot([], [], 'b-')         # line connecting points print in Blue.
-scatter = ax.scatter([], [], color='red')  # points print in Red.
+# animated=True: the two artists are left out of normal redraws and drawn by hand (blitting).
+line, = ax.plot([], [], 'b-', animated=True)         # line connecting points print in Blue.
+scatter = ax.scatter([], [], color='red', animated=True)  # points print in Red.
+
+# Limits and aspect never change, so set them once instead of every frame.
+ax.set_aspect('equal') # define that scale of x and y is the same.
+ax.set_xlim(-2.5, 2.5)       # manually fix x-limits
+ax.set_ylim(-2.5, 2.5)       # manually fix y-limits
 
 # The last point is as the first point, the purpose is to draw the last line back to the first point.
 points = np.array([[2,1],[2,-1],[-2,-1],[-2,1],[2,1]])
 
 theta= np.pi/128 # The angle was choosen to be small enugh for smooth rotation.
-# Matrix that rotates the rectangle (5 points vector) by theta.
-R= np.array([[np.cos(theta), -np.sin(theta)], [np.sin(theta), np.cos(theta)]])
+n_frames = 200
+# Frame i is the original rectangle rotated by i*theta, so build all 200 rotation
+# matrices at once instead of multiplying by R again every frame (no drift).
+angles = np.arange(n_frames) * theta
+cos, sin = np.cos(angles), np.sin(angles)
+rots = np.stack([cos, -sin, sin, cos], axis=-1).reshape(n_frames, 2, 2)
+# Rotate the 5 points for every frame in one call: all_points[k] = points @ rots[k].T
+# all_points is 200X5X2, one 5X2 points matrix per frame.
+all_points = np.einsum('kij,pj->kpi', rots, points)
+
+# Draw the static parts (axes, title, grid) once and keep a copy of the pixels.
+plt.show(block=False)
+plt.pause(0.1)
+background = fig.canvas.copy_from_bbox(ax.bbox)
+
+def on_draw(event):
+    # A full redraw (e.g. window resize) invalidates the saved background.
+    global background
+    background = fig.canvas.copy_from_bbox(ax.bbox)
+
+fig.canvas.mpl_connect('draw_event', on_draw)
 
 # Do 200 rotations
-for i in range(200):   
+for i in range(n_frames):   
+    points = all_points[i]
+    # Paint the saved background back, then only the two moving artists on top.
+    fig.canvas.restore_region(background)
     # update line and scatter
     # put all rows first column (x) and all rows second column (y).
     line.set_data(points[:,0], points[:,1])
-    scatter.set_offsets(np.c_[points[:,0], points[:,1]])  # scatter uses set_offsets for new points
-    ax.relim() # Ensures the axes scale correctly as points are added.
-    ax.autoscale_view()
-    plt.gca().set_aspect('equal') # define that scale of x and y is the same.
-    ax.set_xlim(-2.5, 2.5)       # manually fix x-limits
-    ax.set_ylim(-2.5, 2.5)       # manually fix y-limits
-    plt.draw()
-    # Pauses for 0.5 seconds to let the GUI refresh and to see the animation.
+    scatter.set_offsets(points)  # scatter uses set_offsets for new points
+    ax.draw_artist(line)
+    ax.draw_artist(scatter)
+    # Copy just the axes area to the screen.
+    fig.canvas.blit(ax.bbox)
+    fig.canvas.flush_events()
+    # Waits 0.01 seconds to see the animation, without redrawing the whole figure.
     # Also gives time for the window to respond to events (resize, move, close).
-    plt.pause(0.01)
-    # Calculate the new points by multiply the points matrix by transpose of the rotation matrix.
-    # points is 5X2 matrix, R is 2X2 matrix. The result is 5X2 matrix, the new points.
-    points = points @ R.T 
+    fig.canvas.start_event_loop(0.01)
 
+# Back to normal drawing so the final frame stays visible in the last window.
+line.set_animated(False)
+scatter.set_animated(False)
 plt.ioff()
 plt.show()
 